@@ -0,0 +1,33 @@
+"""
+Refresh token purger: deletes expired and revoked rows of `refresh_tokens`.
+
+Runs inside the app lifespan, at startup and then every PURGE_INTERVAL, in
+batches of PURGE_BATCH_SIZE (one DELETE and transaction each). Revoked and
+expired tokens are already rejected at lookup, so this only keeps the table
+and its indexes small.
+"""
+import logging
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.api.auth.repository import AuthRepository
+from app.core.tasks import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL = timedelta(hours=1)
+
+
+class RefreshTokenPurger(PeriodicTask):
+    """Background task running `AuthRepository.cleanup_expired_tokens` every PURGE_INTERVAL."""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def tick(self) -> None:
+        async with self.session_factory() as session:
+            deleted = await AuthRepository(session).cleanup_expired_tokens()
+        if deleted:
+            logger.info("Purged %d expired or revoked refresh tokens", deleted)
+
+    def _seconds_until_next_run(self) -> float:
+        return PURGE_INTERVAL.total_seconds()
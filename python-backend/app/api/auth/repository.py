@@ -1,8 +1,21 @@
-from typing import Optional, List
-from sqlalchemy import select, and_
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, and_, or_, delete, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.refresh_token import RefreshToken
 from app.db.models.user import User
 
+# Refresh token rows deleted per statement by cleanup_expired_tokens
+PURGE_BATCH_SIZE = 1000
+
+
+def hash_token(token: str) -> str:
+    """Lookup key of a refresh token. Tokens are signed and random (jti), so a plain SHA-256 suffices."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 class AuthRepository:
     """Authentication repository for database operations."""
     
@@ -51,60 +64,66 @@ class AuthRepository:
         )
         return result.scalar_one_or_none() is not None
     
+    async def add_refresh_token(self, user_id: str, token: str, expires_at: datetime) -> None:
+        """Store a new session's refresh token (hashed); caller commits."""
+        self.session.add(RefreshToken(
+            id=str(uuid.uuid4()),
+            userId=user_id,
+            tokenHash=hash_token(token),
+            expiresAt=expires_at,
+        ))
+    
     async def get_valid_refresh_token(self, token: str) -> Optional[RefreshToken]:
-        """Get valid refresh token."""
-        from datetime import datetime
+        """Get an unexpired, unrevoked refresh token by its hash."""
         result = await self.session.execute(
             select(RefreshToken).where(
                 and_(
-                    RefreshToken.token == token,
-                    RefreshToken.expires_at > datetime.utcnow(),
-                    RefreshToken.is_revoked == "false"
+                    RefreshToken.tokenHash == hash_token(token),
+                    RefreshToken.expiresAt > func.now(),
+                    RefreshToken.revokedAt.is_(None),
                 )
             )
         )
         return result.scalar_one_or_none()
     
-    async def get_user_refresh_tokens(self, user_id: str) -> List[RefreshToken]:
-        """Get all refresh tokens for a user."""
+    async def revoke_refresh_token(self, token: str) -> bool:
+        """Revoke one session's refresh token with a single UPDATE."""
         result = await self.session.execute(
-            select(RefreshToken).where(RefreshToken.user_id == user_id)
+            update(RefreshToken)
+            .where(RefreshToken.tokenHash == hash_token(token), RefreshToken.revokedAt.is_(None))
+            .values(revokedAt=func.now())
         )
-        return result.scalars().all()
-    
-    async def revoke_refresh_token(self, token: str) -> bool:
-        """Revoke a refresh token."""
-        db_token = await self.get_valid_refresh_token(token)
-        if db_token:
-            db_token.is_revoked = "true"
-            await self.session.commit()
-            return True
-        return False
-    
-    async def revoke_all_user_tokens(self, user_id: str) -> int:
-        """Revoke all refresh tokens for a user."""
-        tokens = await self.get_user_refresh_tokens(user_id)
-        revoked_count = 0
-        
-        for token in tokens:
-            token.is_revoked = "true"
-            revoked_count += 1
-        
         await self.session.commit()
-        return revoked_count
+        return result.rowcount > 0
     
-    async def cleanup_expired_tokens(self) -> int:
-        """Remove expired refresh tokens."""
-        from datetime import datetime
+    async def revoke_all_user_tokens(self, user_id: str) -> int:
+        """Revoke every live session of a user with a single UPDATE."""
         result = await self.session.execute(
-            select(RefreshToken).where(RefreshToken.expires_at < datetime.utcnow())
+            update(RefreshToken)
+            .where(
+                RefreshToken.userId == user_id,
+                RefreshToken.expiresAt > func.now(),
+                RefreshToken.revokedAt.is_(None),
+            )
+            .values(revokedAt=func.now())
         )
-        expired_tokens = result.scalars().all()
-        
-        deleted_count = 0
-        for token in expired_tokens:
-            await self.session.delete(token)
-            deleted_count += 1
-        
         await self.session.commit()
-        return deleted_count
+        return result.rowcount
+    
+    async def cleanup_expired_tokens(self, batch_size: int = PURGE_BATCH_SIZE) -> int:
+        """
+        Delete expired and revoked refresh tokens, `batch_size` rows per DELETE
+        and transaction, so a large backlog never holds long locks.
+        """
+        deleted = 0
+        while True:
+            batch = (
+                select(RefreshToken.id)
+                .where(or_(RefreshToken.expiresAt < func.now(), RefreshToken.revokedAt.is_not(None)))
+                .limit(batch_size)
+            )
+            result = await self.session.execute(delete(RefreshToken).where(RefreshToken.id.in_(batch)))
+            await self.session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
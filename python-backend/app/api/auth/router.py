@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
@@ -31,7 +31,7 @@ async def google_auth_callback(code: str, request: Request, auth_service: AuthSe
     """Handle Google OAuth callback."""
     try:
         token_data = await google_oauth.exchange_code_for_tokens(code)
-        user_info = await google_oauth.get_user_info(token_data['access_token'])
+        user_info = await google_oauth.get_login_claims(token_data)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -69,9 +69,10 @@ async def refresh_access_token(
 async def logout(
     request: Request,
     response: Response,
+    everywhere: bool = Query(False, description="Revoke the refresh tokens of all of the user's devices"),
     current_user: User = Depends(get_current_user),
     auth_service: AuthService = Depends(get_auth_service),
     _: bool = Depends(verify_api_key)
 ):
-    """Logout user."""
-    return await auth_service.logout(current_user.id, response)
+    """Logout user: revoke this device's refresh token, or every device's with everywhere=true."""
+    return await auth_service.logout(current_user.id, response, request.cookies.get("refresh_token"), everywhere)
@@ -3,9 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from sqlalchemy.future import select
 import uuid
+from datetime import datetime, timezone
 from app.db.models.user import User
 from app.core.security import create_access_token, create_refresh_token
 from app.api.users.repository import UsersRepository
+from app.api.auth.repository import AuthRepository
+from app.utils.helpers import parse_timedelta
+from app.core.user_cache import user_cache
 
 class AuthService:
     def __init__(self, db: AsyncSession):
@@ -50,8 +54,9 @@ class AuthService:
                 detail="User not found",
             )
 
-        # Verify the refresh token matches the stored token
-        if not user.refreshToken or user.refreshToken != refresh_token:
+        # Verify the refresh token is a live session of this user
+        stored = await AuthRepository(self.db).get_valid_refresh_token(refresh_token)
+        if stored is None or stored.userId != user.id:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
@@ -63,13 +68,14 @@ class AuthService:
 
         return {"access_token": access_token}
 
-    async def logout(self, user_id: str, response: Response):
-        """Logout user by clearing their refresh token."""
-        repo = UsersRepository(self.db)
-        user = await repo.get_by_id(user_id)
-        if user:
-            user.refreshToken = None
-            await self.db.commit()
+    async def logout(self, user_id: str, response: Response, refresh_token: str | None = None, everywhere: bool = False):
+        """Logout user by revoking this session's refresh token, or all of their sessions."""
+        repo = AuthRepository(self.db)
+        if everywhere:
+            await repo.revoke_all_user_tokens(user_id)
+        elif refresh_token:
+            await repo.revoke_refresh_token(refresh_token)
+        user_cache.invalidate(user_id)
         # Delete cookie with same attributes used when setting it (see auth/router.py)
         response.delete_cookie(
             key="refresh_token",
@@ -99,11 +105,13 @@ class AuthService:
         return new_user
 
     async def generate_and_set_tokens(self, user: User):
-        """Generate access and refresh tokens, and store the hashed refresh token."""
+        """Generate access and refresh tokens, and store the hashed refresh token as a new session."""
         access_token = create_access_token(data={"sub": user.id})
         refresh_token = create_refresh_token(data={"sub": user.id})
+        expires_at = datetime.now(timezone.utc) + parse_timedelta(settings.REFRESH_TOKEN_EXPIRE)
 
-        user.refreshToken = refresh_token
+        await AuthRepository(self.db).add_refresh_token(user.id, refresh_token, expires_at)
         await self.db.commit()
+        user_cache.invalidate(user.id)
         
         return access_token, refresh_token
\ No newline at end of file
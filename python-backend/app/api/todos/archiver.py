@@ -0,0 +1,84 @@
+"""
+Archiver: moves completed todos untouched for TODO_ARCHIVE_AFTER_DAYS from
+`todos` into `todos_archive`, keeping the hot table (and its indexes) to the
+todos people still work with.
+
+Runs inside the app lifespan, at startup and then every ARCHIVE_INTERVAL, in
+batches of ARCHIVE_BATCH_SIZE. Each batch is one transaction; on Postgres it
+is a single DELETE ... RETURNING feeding an INSERT, and SKIP LOCKED lets
+several workers archive concurrently.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.api.users.repository import UsersRepository
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.db.models.todo import Todo
+from app.db.models.todo_archive import TodoArchive
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_INTERVAL = timedelta(hours=1)
+
+# Every todos column; todos_archive has these plus archivedAt
+ARCHIVED_COLUMNS = [column.name for column in Todo.__table__.c]
+
+
+async def archive_completed(session: AsyncSession, before: datetime) -> int:
+    """Move completed todos last updated before `before` to the archive; returns how many moved."""
+    users = UsersRepository(session)
+    moved_total = 0
+    while True:
+        # Walks the partial (updatedAt) WHERE status = 'completed' index
+        batch = (
+            select(Todo.id)
+            .where(Todo.status == "completed", Todo.updatedAt < before)
+            .limit(ARCHIVE_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        if session.bind.dialect.name == "postgresql":
+            moved = delete(Todo).where(Todo.id.in_(batch)).returning(*Todo.__table__.c).cte("moved")
+            result = await session.execute(
+                insert(TodoArchive)
+                .from_select(ARCHIVED_COLUMNS, select(*(moved.c[name] for name in ARCHIVED_COLUMNS)))
+                .returning(TodoArchive.userId)
+            )
+            user_ids = result.scalars().all()
+        else:
+            result = await session.execute(select(Todo.id, Todo.userId).where(Todo.id.in_(batch)))
+            rows = result.all()
+            ids = [row.id for row in rows]
+            user_ids = [row.userId for row in rows]
+            if ids:
+                await session.execute(
+                    insert(TodoArchive).from_select(
+                        ARCHIVED_COLUMNS, select(*Todo.__table__.c).where(Todo.id.in_(ids))
+                    )
+                )
+                await session.execute(delete(Todo).where(Todo.id.in_(ids)))
+        # Archived todos drop out of the default lists, so cached ETags must go
+        await users.bump_versions(sorted(set(user_ids)))
+        await session.commit()
+        moved_total += len(user_ids)
+        if len(user_ids) < ARCHIVE_BATCH_SIZE:
+            return moved_total
+
+
+class TodoArchiver(PeriodicTask):
+    """Background task running `archive_completed` every ARCHIVE_INTERVAL."""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def tick(self) -> None:
+        before = datetime.now(timezone.utc) - timedelta(days=settings.TODO_ARCHIVE_AFTER_DAYS)
+        async with self.session_factory() as session:
+            moved = await archive_completed(session, before)
+        if moved:
+            logger.info("Archived %d completed todos", moved)
+
+    def _seconds_until_next_run(self) -> float:
+        return ARCHIVE_INTERVAL.total_seconds()
@@ -0,0 +1,245 @@
+"""
+Due-date reminders.
+
+`ReminderScheduler` holds only the todos due within the next window in a heap.
+The window is filled by a range query on the partial (dueDate) WHERE
+status = 'pending' index, one window at a time. TodoService writes reach the
+heap through the todo event hub, so they adjust it without a rescan; with
+TODO_EVENTS_PG_NOTIFY that includes other workers' writes. Each tick pops
+due entries off the heap, so its cost does not depend on the size of the
+todos table.
+
+A due reminder is claimed by setting todos.remindedAt with a conditional
+UPDATE before it is handed to the sinks. With several workers, exactly one
+sends it, and a restart does not repeat it. Delivery is at most once.
+"""
+import asyncio
+import heapq
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.events import todo_events
+from app.core.http_client import get_http_client
+from app.core.tasks import BackgroundTask
+from app.db.models.notification import Notification
+from app.db.models.todo import Todo
+
+logger = logging.getLogger(__name__)
+
+# How far ahead the heap is filled from the database
+REMINDER_WINDOW = timedelta(hours=1)
+# Reminders claimed per UPDATE
+CLAIM_BATCH_SIZE = 500
+WEBHOOK_TIMEOUT_SECONDS = 5.0
+RETRY_SECONDS = 30
+
+
+@dataclass
+class Reminder:
+    todoId: str
+    userId: str
+    title: str
+    dueDate: datetime
+
+
+class ReminderSink:
+    """Destination for reminders that are due."""
+
+    async def send(self, reminders: List[Reminder]) -> None:
+        raise NotImplementedError
+
+
+class LogReminderSink(ReminderSink):
+    """Writes reminders to the application log."""
+
+    async def send(self, reminders: List[Reminder]) -> None:
+        for reminder in reminders:
+            logger.info("Todo %s of user %s is due (%s)", reminder.todoId, reminder.userId, reminder.dueDate.isoformat())
+
+
+class WebhookReminderSink(ReminderSink):
+    """POSTs each batch of reminders as a JSON array to a URL."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    async def send(self, reminders: List[Reminder]) -> None:
+        payload = [{**asdict(reminder), "dueDate": reminder.dueDate.isoformat()} for reminder in reminders]
+        response = await get_http_client().post(self.url, json=payload, timeout=WEBHOOK_TIMEOUT_SECONDS)
+        response.raise_for_status()
+
+
+class NotificationReminderSink(ReminderSink):
+    """Stores reminders as in-app notifications."""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def send(self, reminders: List[Reminder]) -> None:
+        async with self.session_factory() as session:
+            await session.execute(insert(Notification), [
+                {
+                    "id": str(uuid.uuid4()),
+                    "userId": reminder.userId,
+                    "todoId": reminder.todoId,
+                    "kind": "todo_due",
+                    "message": f'"{reminder.title}" is due',
+                }
+                for reminder in reminders
+            ])
+            await session.commit()
+
+
+def build_reminder_sinks(session_factory: async_sessionmaker) -> List[ReminderSink]:
+    """Sinks named in TODO_REMINDER_SINKS (comma-separated: log, webhook, notification)."""
+    sinks = []
+    for name in filter(None, (part.strip() for part in settings.TODO_REMINDER_SINKS.split(","))):
+        if name == "log":
+            sinks.append(LogReminderSink())
+        elif name == "webhook":
+            if not settings.TODO_REMINDER_WEBHOOK_URL:
+                raise ValueError("TODO_REMINDER_WEBHOOK_URL is required for the webhook reminder sink")
+            sinks.append(WebhookReminderSink(settings.TODO_REMINDER_WEBHOOK_URL))
+        elif name == "notification":
+            sinks.append(NotificationReminderSink(session_factory))
+        else:
+            raise ValueError(f"Unknown reminder sink: {name}")
+    return sinks
+
+
+class ReminderScheduler(BackgroundTask):
+    """Background task sending due-date reminders; see the module docstring."""
+
+    def __init__(self, session_factory: async_sessionmaker, sinks: List[ReminderSink], window: timedelta = REMINDER_WINDOW):
+        self.session_factory = session_factory
+        self.sinks = sinks
+        self.window = window
+        self._heap: List[Tuple[datetime, str]] = []
+        # todo id -> (dueDate, userId) of its live heap entry; other heap entries are stale
+        self._scheduled: Dict[str, Tuple[datetime, str]] = {}
+        self._window_end: Optional[datetime] = None
+        self._reload = True
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        todo_events.add_listener(self._on_events)
+        super().start()
+
+    async def stop(self) -> None:
+        todo_events.remove_listener(self._on_events)
+        await super().stop()
+
+    def _on_events(self, user_id: Optional[str], events: List[dict]) -> None:
+        """Apply committed todo changes to the heap (called by the event hub)."""
+        for event in events:
+            todo = event.get("todo")
+            if event["type"] == "deleted":
+                self._scheduled.pop(event["id"], None)
+            elif event["type"] in ("created", "updated") and todo is not None:
+                self._scheduled.pop(todo["id"], None)
+                due = datetime.fromisoformat(todo["dueDate"]) if todo["dueDate"] else None
+                if due is not None and not todo["completed"] and self._window_end and due < self._window_end:
+                    self._schedule(todo["id"], user_id, due)
+            else:
+                # resync, or an event that had to drop its todo: rebuild the window
+                self._reload = True
+        self._wakeup.set()
+
+    def _schedule(self, todo_id: str, user_id: str, due: datetime) -> None:
+        self._scheduled[todo_id] = (due, user_id)
+        heapq.heappush(self._heap, (due, todo_id))
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = datetime.now()
+            try:
+                if self._reload or now >= self._window_end:
+                    await self._load_window(now)
+                await self._fire_due(now)
+                wake_at = min(self._heap[0][0], self._window_end) if self._heap else self._window_end
+                timeout = max((wake_at - datetime.now()).total_seconds(), 0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Reminder tick failed")
+                timeout = RETRY_SECONDS
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _load_window(self, now: datetime) -> None:
+        """Slide the window forward, or rebuild it from the start of today after a reload."""
+        if self._reload or self._window_end is None:
+            self._heap.clear()
+            self._scheduled.clear()
+            # Todos due earlier today that were never reminded (e.g. while no worker ran) go out now
+            start = datetime.combine(date.today(), time.min)
+            self._reload = False
+        else:
+            start = self._window_end
+        end = max(start, now) + self.window
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Todo.id, Todo.userId, Todo.dueDate).where(
+                    Todo.status == "pending",
+                    Todo.dueDate >= start,
+                    Todo.dueDate < end,
+                    Todo.remindedAt == None,
+                )
+            )
+            for todo_id, user_id, due in result:
+                self._schedule(todo_id, user_id, due)
+        self._window_end = end
+
+    async def _fire_due(self, now: datetime) -> None:
+        due_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            due, todo_id = heapq.heappop(self._heap)
+            entry = self._scheduled.get(todo_id)
+            if entry is None or entry[0] != due:
+                continue  # rescheduled, completed or deleted since it was pushed
+            del self._scheduled[todo_id]
+            due_ids.append(todo_id)
+        for offset in range(0, len(due_ids), CLAIM_BATCH_SIZE):
+            reminders = await self._claim(due_ids[offset:offset + CLAIM_BATCH_SIZE], now)
+            for sink in self.sinks:
+                try:
+                    await sink.send(reminders)
+                except Exception:
+                    logger.exception("Reminder sink %s failed", type(sink).__name__)
+
+    async def _claim(self, todo_ids: List[str], now: datetime) -> List[Reminder]:
+        """Mark todos as reminded, skipping any another worker (or a later write) got to first."""
+        claimable = (
+            Todo.id.in_(todo_ids),
+            Todo.remindedAt == None,
+            Todo.status == "pending",
+            Todo.dueDate <= now,
+        )
+        stmt = (
+            update(Todo)
+            .where(*claimable)
+            # Not a content change: keep updatedAt so delta sync does not re-send these
+            .values(remindedAt=func.now(), updatedAt=Todo.updatedAt)
+            .execution_options(synchronize_session=False)
+        )
+        columns = (Todo.id, Todo.userId, Todo.title, Todo.dueDate)
+        async with self.session_factory() as session:
+            if session.bind.dialect.update_returning:
+                result = await session.execute(stmt.returning(*columns))
+                rows = result.all()
+            else:
+                result = await session.execute(select(*columns).where(*claimable).with_for_update())
+                rows = result.all()
+                await session.execute(stmt)
+            await session.commit()
+        return [Reminder(todoId=row.id, userId=row.userId, title=row.title, dueDate=row.dueDate) for row in rows]
@@ -1,8 +1,15 @@
 from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import select, and_, or_
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, and_, or_, delete, func, literal, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.todo import Todo
+from app.db.models.todo_archive import TodoArchive
+from app.db.models.todo_counter import TodoCounter
+from app.db.models.todo_tombstone import TodoTombstone
+
+# (dimension, value) -> count delta
+CounterDeltas = Dict[Tuple[str, str], int]
 
 class TodosRepository:
     """Todo repository for database operations."""
@@ -53,4 +60,106 @@ class TodosRepository:
             return False
         await self.session.delete(todo)
         await self.session.commit()
-        return True
\ No newline at end of file
+        return True
+
+
+class TodoCountersRepository:
+    """Per-user todo counters (totals, completed, per priority and per category)."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def apply(self, user_id: str, deltas: CounterDeltas) -> None:
+        """Add deltas to the user's counters in one upsert; caller commits."""
+        rows = [
+            {"userId": user_id, "dimension": dimension, "value": value, "count": delta}
+            for (dimension, value), delta in deltas.items()
+            if delta
+        ]
+        if not rows:
+            return
+        dialect = self.session.bind.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert_stmt = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert_stmt(TodoCounter).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["userId", "dimension", "value"],
+                set_={"count": TodoCounter.count + stmt.excluded["count"]},
+            )
+            await self.session.execute(stmt)
+            return
+        for row in rows:
+            result = await self.session.execute(
+                update(TodoCounter)
+                .where(
+                    TodoCounter.userId == user_id,
+                    TodoCounter.dimension == row["dimension"],
+                    TodoCounter.value == row["value"],
+                )
+                .values(count=TodoCounter.count + row["count"])
+            )
+            if not result.rowcount:
+                self.session.add(TodoCounter(**row))
+
+    async def get(self, user_id: str) -> CounterDeltas:
+        """Return the user's counters as {(dimension, value): count}."""
+        result = await self.session.execute(
+            select(TodoCounter.dimension, TodoCounter.value, TodoCounter.count).where(TodoCounter.userId == user_id)
+        )
+        return {(dimension, value): count for dimension, value, count in result}
+
+    async def rebuild(self, user_id: Optional[str] = None) -> int:
+        """
+        Recompute counters from the todos and todos_archive tables with GROUP BY,
+        replacing the stored ones. Restricted to one user when `user_id` is given.
+        Caller commits.
+        """
+        def rows_of(model):
+            stmt = select(model.userId, model.completed, model.priority, model.category)
+            return stmt.where(model.userId == user_id) if user_id else stmt
+
+        todos = union_all(rows_of(Todo), rows_of(TodoArchive)).subquery("all_todos")
+        recomputed = union_all(
+            select(todos.c.userId, literal("total"), literal(""), func.count()).group_by(todos.c.userId),
+            select(todos.c.userId, literal("completed"), literal(""), func.count())
+            .where(todos.c.completed == True)
+            .group_by(todos.c.userId),
+            select(todos.c.userId, literal("priority"), todos.c.priority, func.count())
+            .group_by(todos.c.userId, todos.c.priority),
+            select(todos.c.userId, literal("category"), todos.c.category, func.count())
+            .group_by(todos.c.userId, todos.c.category),
+        )
+        clear = delete(TodoCounter)
+        if user_id:
+            clear = clear.where(TodoCounter.userId == user_id)
+        await self.session.execute(clear)
+        result = await self.session.execute(
+            TodoCounter.__table__.insert().from_select(["userId", "dimension", "value", "count"], recomputed)
+        )
+        return result.rowcount
+
+
+class TodoTombstonesRepository:
+    """Deleted todo ids, served to delta sync clients until they expire."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def record(self, user_id: str, todo_ids: List[str]) -> None:
+        """Record deleted todos; caller commits (in the same transaction as the delete)."""
+        if todo_ids:
+            await self.session.execute(
+                TodoTombstone.__table__.insert(),
+                [{"id": todo_id, "userId": user_id} for todo_id in todo_ids],
+            )
+
+    async def deleted_since(self, user_id: str, since: datetime) -> List[str]:
+        result = await self.session.execute(
+            select(TodoTombstone.id).where(TodoTombstone.userId == user_id, TodoTombstone.deletedAt > since)
+        )
+        return result.scalars().all()
+
+    async def purge(self, before: datetime) -> int:
+        """Delete tombstones older than `before`; caller commits."""
+        result = await self.session.execute(delete(TodoTombstone).where(TodoTombstone.deletedAt < before))
+        return result.rowcount
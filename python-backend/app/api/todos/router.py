@@ -1,12 +1,42 @@
-from fastapi import APIRouter, Depends, Request, Query, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, Request, Response, Query, HTTPException, status
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, List
-from app.db.session import get_db
+from typing import Optional, List, Union
+from app.db.session import read_session
 from app.db.models.user import User
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_streaming_user, get_user_db
 from app.core.api_key_guard import verify_api_key
+from app.core.events import todo_events
+from app.core.http_cache import compute_etag, etag_matches, not_modified, set_cache_headers
 from app.api.todos.service import TodoService
-from app.api.todos.schemas import TodoCreate, TodoUpdate, TodoResponse
+from app.api.users.repository import UsersRepository
+from app.api.todos.schemas import (
+    TodoCreate,
+    TodoUpdate,
+    TodoResponse,
+    TodoPage,
+    TodoBatchCreate,
+    TodoBatchUpdate,
+    TodoBatchDelete,
+    TodoBatchResponse,
+    TodoStats,
+    TodoImportSummary,
+    TodoChanges,
+)
+
+class OrjsonResponse(JSONResponse):
+    """JSON encoded with orjson, for payloads built from plain rows (datetimes as isoformat())."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+# format -> (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
 
 router = APIRouter(prefix="/todos", tags=["Todos"], dependencies=[Depends(verify_api_key)])
 
@@ -14,23 +44,40 @@ router = APIRouter(prefix="/todos", tags=["Todos"], dependencies=[Depends(verify
 async def create_todo(
     todo_model: TodoCreate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_user_db),
 ):
     """Create a new todo."""
     service = TodoService(db)
     return await service.create(current_user.id, todo_model.model_dump())
 
-@router.get("", response_model=List[TodoResponse])
+@router.get("", response_model=Union[TodoPage, List[TodoResponse]])
 async def get_all_todos(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_user_db),
     search: str | None = Query(None),
     priority: str | None = Query(None),
     status: str | None = Query(None),
     orderBy: str | None = Query(None),
     category: str | None = Query(None),
+    limit: int | None = Query(None, ge=1, le=200),
+    cursor: str | None = Query(None),
+    includeArchived: bool = Query(False),
 ):
-    """Get all user todos."""
+    """
+    Get all user todos.
+    Passing `limit` and/or `cursor` returns a page with a `next_cursor` instead of the full list.
+    Archived todos are left out unless status=completed&includeArchived=true.
+    Supports conditional GET: a matching If-None-Match gets a 304 without querying todos.
+    The payload is built from plain rows and returned as an OrjsonResponse, so
+    response_model only documents the shape and is not re-validated.
+    """
+    # status=pending/overdue depend on the current day, so it is part of the variant
+    data_version = await UsersRepository(db).get_data_version(current_user)
+    etag = compute_etag(current_user.id, data_version, date.today(), sorted(request.query_params.multi_items()))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     todo_service = TodoService(db)
     filters = {
         "search": search,
@@ -38,28 +85,153 @@ async def get_all_todos(
         "status": status,
         "orderBy": orderBy,
         "category": category,
+        "limit": limit,
+        "cursor": cursor,
+        "includeArchived": includeArchived,
     }
-    return await todo_service.find_all(current_user.id, filters)
+    response = OrjsonResponse(await todo_service.find_all(current_user.id, filters))
+    set_cache_headers(response, etag)
+    return response
+
+@router.get("/stream")
+async def stream_todo_events(current_user: User = Depends(get_streaming_user)):
+    """
+    Server-Sent Events with the user's todo changes as they commit.
+    Each event is named after its `type`: created/updated (with the todo),
+    deleted (id only) or resync, after which the client should catch up via
+    GET /todos/changes. A keepalive comment is sent every 15 seconds.
+    """
+    return StreamingResponse(
+        todo_events.sse(current_user.id),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: stop nginx from holding events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/changes", response_model=TodoChanges)
+async def get_todo_changes(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_user_db),
+    since: str | None = Query(None, description="sync_token from the previous call"),
+):
+    """
+    Delta sync: todos created or updated and ids deleted since `since`.
+    Omit `since` for the initial full sync; when `reset` is true the client
+    should replace its local copy instead of merging.
+    """
+    todo_service = TodoService(db)
+    return OrjsonResponse(await todo_service.changes(current_user.id, since))
+
+@router.get("/stats", response_model=TodoStats)
+async def get_todo_stats(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_user_db),
+):
+    """
+    Get aggregated todo statistics (totals, completion, overdue, by priority and category).
+    Served from per-user counters rather than a scan of the user's todos.
+    """
+    # overdue depends on the current day, so it is part of the variant
+    data_version = await UsersRepository(db).get_data_version(current_user)
+    etag = compute_etag(current_user.id, data_version, date.today(), "stats")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+
+    todo_service = TodoService(db)
+    return await todo_service.get_stats(current_user.id)
+
+@router.get("/export")
+async def export_todos(
+    current_user: User = Depends(get_streaming_user),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+):
+    """
+    Stream all user todos as NDJSON (one todo per line) or CSV.
+    The response is written while rows are still being read from the database.
+    """
+    user_id = current_user.id
+
+    async def body():
+        # The stream outlives the request-scoped session, so it opens its own
+        async with read_session(user_id) as session:
+            async for chunk in TodoService(session).export(user_id, export_format):
+                yield chunk
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="todos.{extension}"'},
+    )
+
+@router.post("/import", response_model=TodoImportSummary)
+async def import_todos(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_user_db),
+    import_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+):
+    """
+    Import todos from an NDJSON or CSV request body (same columns as the export).
+    The body is parsed as it streams in; each record is validated like a single create.
+    """
+    todo_service = TodoService(db)
+    return await todo_service.import_todos(current_user.id, request.stream(), import_format)
+
+@router.post("/batch", response_model=TodoBatchResponse)
+async def create_todos_batch(
+    batch: TodoBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_user_db),
+):
+    """Create several todos in one transaction."""
+    service = TodoService(db)
+    results = await service.create_many(current_user.id, [item.model_dump() for item in batch.items])
+    return {"results": results}
+
+@router.patch("/batch", response_model=TodoBatchResponse)
+async def update_todos_batch(
+    batch: TodoBatchUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_user_db),
+):
+    """Update several todos in one transaction."""
+    service = TodoService(db)
+    results = await service.update_many(current_user.id, [item.model_dump(exclude_unset=True) for item in batch.items])
+    return {"results": results}
+
+@router.delete("/batch", response_model=TodoBatchResponse)
+async def delete_todos_batch(
+    batch: TodoBatchDelete,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_user_db),
+):
+    """Delete several todos in one transaction."""
+    service = TodoService(db)
+    return {"results": await service.delete_many(current_user.id, batch.ids)}
 
 @router.get("/{todo_id}", response_model=TodoResponse)
 async def get_todo(
     todo_id: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_user_db),
 ):
     """Get a specific todo by id."""
     todo_service = TodoService(db)
     todo = await todo_service.find_one(current_user.id, todo_id)
     if not todo:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found")
-    return todo
+    return OrjsonResponse(todo)
 
 @router.patch("/{todo_id}", response_model=TodoResponse)
 async def update_todo(
     todo_id: str,
     todo_model: TodoUpdate,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_user_db),
 ):
     """Update a todo."""
     todo_service = TodoService(db)
@@ -72,7 +244,7 @@ async def update_todo(
 async def delete_todo(
     todo_id: str,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_user_db),
 ):
     """Delete a todo."""
     service = TodoService(db)
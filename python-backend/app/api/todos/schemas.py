@@ -1,7 +1,10 @@
 from datetime import datetime, date
-from typing import Optional
+from typing import Dict, Optional, List
 from pydantic import BaseModel, Field, ConfigDict
 
+# Upper bound on the number of operations in one batch request
+MAX_BATCH_SIZE = 500
+
 class TodoCreate(BaseModel):
     """Schema for creating a new todo."""
     title: str = Field(min_length=1, max_length=255, description="Title is required")
@@ -29,4 +32,67 @@ class TodoResponse(BaseModel):
     dueDate: Optional[str] = None
     completed: bool
     createdAt: str
-    updatedAt: str
\ No newline at end of file
+    updatedAt: str
+
+class TodoPage(BaseModel):
+    """Schema for a cursor-paginated page of todos."""
+    items: List[TodoResponse]
+    next_cursor: Optional[str] = None
+
+
+class TodoBatchCreate(BaseModel):
+    """Schema for creating several todos at once."""
+    items: List[TodoCreate] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+class TodoBatchUpdateItem(TodoUpdate):
+    """Schema for one item of a batch update."""
+    id: str
+
+class TodoBatchUpdate(BaseModel):
+    """Schema for updating several todos at once."""
+    items: List[TodoBatchUpdateItem] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+class TodoBatchDelete(BaseModel):
+    """Schema for deleting several todos at once."""
+    ids: List[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+class TodoBatchResult(BaseModel):
+    """Outcome of one item of a batch request."""
+    index: int
+    id: Optional[str] = None
+    status: int
+    detail: Optional[str] = None
+    todo: Optional[TodoResponse] = None
+
+class TodoBatchResponse(BaseModel):
+    """Schema for batch responses (one result per item, in request order)."""
+    results: List[TodoBatchResult]
+
+class TodoStats(BaseModel):
+    """Schema for aggregated todo statistics."""
+    total: int
+    completed: int
+    pending: int
+    overdue: int
+    byPriority: Dict[str, int]
+    byCategory: Dict[str, int]
+
+class TodoImportError(BaseModel):
+    """A rejected record of an import (1-based record number)."""
+    row: int
+    title: Optional[str] = None
+    detail: str
+
+class TodoImportSummary(BaseModel):
+    """Outcome of a bulk import."""
+    received: int
+    created: int
+    failed: int
+    errors: List[TodoImportError]
+
+class TodoChanges(BaseModel):
+    """Schema for a delta sync response."""
+    changes: List[TodoResponse]
+    deleted: List[str]
+    reset: bool
+    sync_token: str
@@ -1,52 +1,79 @@
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta, timezone
+import csv
+import io
 import uuid
-from typing import Optional, Dict, Any, List
+import orjson
+from collections import Counter
+from collections.abc import Mapping
+from typing import Optional, Dict, Any, AsyncIterator, List, Tuple, Union
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, or_
+from pydantic import ValidationError
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, text, tuple_, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from app.db.models.todo import Todo
+from app.db.models.todo_archive import TodoArchive
+from app.db.search import apply_todo_search
+from app.api.todos.archiver import ARCHIVED_COLUMNS
+from app.api.todos.repository import TodoCountersRepository, TodoTombstonesRepository, CounterDeltas
+from app.api.users.repository import UsersRepository
+from app.api.todos.schemas import TodoCreate
+from app.core.config import settings
+from app.core.events import RESYNC, todo_events
+from app.core.exceptions import format_validation_errors
+from app.utils.helpers import encode_cursor, decode_cursor, iter_csv_records, iter_ndjson_records
+
+# Page size used when a cursor is supplied without an explicit limit
+DEFAULT_PAGE_SIZE = 50
+
+# Todo fields that feed the per-user counters behind /todos/stats
+COUNTED_FIELDS = ("completed", "priority", "category")
+
+# TodoResponse columns in wire order. Read paths select these as plain Row
+# tuples and hand them to orjson, skipping ORM objects and response_model validation
+RESPONSE_COLUMNS = (
+    Todo.id, Todo.title, Todo.description, Todo.priority, Todo.category,
+    Todo.dueDate, Todo.completed, Todo.createdAt, Todo.updatedAt,
+)
+RESPONSE_FIELDS = tuple(column.key for column in RESPONSE_COLUMNS)
+ARCHIVE_RESPONSE_COLUMNS = tuple(getattr(TodoArchive, field) for field in RESPONSE_FIELDS)
+
+# Delta sync re-sends changes stamped this long before the client's sync token:
+# updatedAt is taken when a write starts (now() on Postgres) but only becomes
+# visible at commit, so a slow transaction can land "in the past"
+SYNC_OVERLAP = timedelta(minutes=5)
+
+# Rows fetched from the server-side cursor (and written out) per chunk of an export
+EXPORT_BATCH_SIZE = 500
+
+# Rows inserted (and committed) per statement during an import
+IMPORT_BATCH_SIZE = 1000
+# Per-row errors reported in an import summary; further failures are only counted
+MAX_IMPORT_ERRORS = 1000
+IMPORT_COLUMNS = ("id", "userId", "title", "description", "priority", "category", "dueDate", "completed", "status")
 
 class TodoService:
     """Todo service."""
     
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.users = UsersRepository(session)
+        self.counters = TodoCountersRepository(session)
+        self.tombstones = TodoTombstonesRepository(session)
     
     async def create(self, user_id: str, model_data: dict) -> dict:
         """Create a new todo."""
         # Parse dueDate if provided
         due_date = None
         if model_data.get("dueDate"):
-            try:
-                # Handle different date formats
-                date_value = model_data["dueDate"]
-                if isinstance(date_value, str):
-                    if "T" in date_value or "Z" in date_value:
-                        due_date = datetime.fromisoformat(date_value.replace("Z", "+00:00"))
-                    else:
-                        # Handle date-only strings like "2024-08-20"
-                        # Parse as date and set to start of day WITHOUT timezone
-                        parsed_date = date.fromisoformat(date_value)
-                        due_date = datetime.combine(parsed_date, time.min)
-                        # Store as naive datetime to avoid timezone issues
-                elif hasattr(date_value, 'isoformat'):
-                    # Handle date objects
-                    due_date = datetime.combine(date_value, time.min)
-                else:
-                    due_date = datetime.fromisoformat(str(date_value))
-                
-                # Validate due date is not before today (day-level comparison)
-                if due_date.date() < date.today():
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Due date must be today or a future date"
-                    )
-            except (ValueError, TypeError) as e:
+            due_date = self._parse_due_date(model_data["dueDate"])
+            # Validate due date is not before today (day-level comparison)
+            if due_date.date() < date.today():
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid date format"
+                    detail="Due date must be today or a future date"
                 )
         
         todo = Todo(
@@ -57,16 +84,20 @@ class TodoService:
             priority=model_data.get("priority", "medium"),
             category=model_data.get("category", "personal"),
             dueDate=due_date,
-            completed=False
+            completed=False,
+            status=self._status(False, due_date)
         )
         
         self.session.add(todo)
         try:
-            await self.session.commit()
+            # Load the server-side timestamps before commit so the change event carries them
+            await self.session.flush()
+            await self.session.refresh(todo)
+            await self._commit_write(user_id, self._counter_deltas(todo), [self._event("created", todo.id, todo)])
         except IntegrityError as e:
             await self.session.rollback()
             # Check if the error is due to a unique constraint violation
-            if "unique_title_per_user" in str(e.orig).lower():
+            if self._is_title_conflict(e):
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="A todo with this title already exists."
@@ -76,37 +107,28 @@ class TodoService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="An unexpected error occurred."
             )
-        await self.session.refresh(todo)
         
-        return {
-            "id": todo.id,
-            "title": todo.title,
-            "description": todo.description,
-            "priority": todo.priority,
-            "category": todo.category,
-            "dueDate": todo.dueDate.isoformat() if todo.dueDate else None,
-            "completed": todo.completed,
-            "createdAt": todo.createdAt.isoformat(),
-            "updatedAt": todo.updatedAt.isoformat()
-        }
+        return self._to_response(todo)
     
-    async def find_all(self, user_id: str, filters: Dict[str, Any]) -> List[dict]:
-        """Find all todos for a user with optional filters."""
-        query = select(Todo).where(Todo.userId == user_id)
+    async def find_all(self, user_id: str, filters: Dict[str, Any]) -> Union[List[dict], dict]:
+        """
+        Find all todos for a user with optional filters.
+
+        Archived todos are only included for status=completed with
+        includeArchived=true; searching them is a plain substring match.
+
+        When `limit` or `cursor` is supplied the result is a keyset page
+        ({"items": [...], "next_cursor": ...}) walked along (createdAt, id),
+        or (rank, createdAt, id) for relevance-ordered searches, so fetching
+        any page costs the same as fetching the first one.
+        """
+        query = select(*RESPONSE_COLUMNS).where(Todo.userId == user_id)
         
         # Apply filters
         status_value = filters.get("status")
         if status_value in ("completed", "pending", "overdue"):
-            if status_value == "completed":
-                query = query.where(Todo.completed == True)
-            elif status_value == "pending":
-                # dueDate >= today and not completed
-                today_midnight = datetime.combine(date.today(), time.min)
-                query = query.where((Todo.completed == False) & ((Todo.dueDate == None) | (Todo.dueDate >= today_midnight)))
-            elif status_value == "overdue":
-                # dueDate < today and not completed
-                today_midnight = datetime.combine(date.today(), time.min)
-                query = query.where((Todo.completed == False) & (Todo.dueDate != None) & (Todo.dueDate < today_midnight))
+            # Materialized on write and by the overdue sweeper
+            query = query.where(Todo.status == status_value)
 
         if filters.get("priority") and filters["priority"] != "all":
             query = query.where(Todo.priority == filters["priority"])
@@ -114,51 +136,294 @@ class TodoService:
         if filters.get("category") and filters["category"] != "all":
             query = query.where(Todo.category == filters["category"])
         
+        rank = None
         if filters.get("search"):
-            search_term = f"%{filters['search']}%"
-            query = query.where(
-                or_(
-                    Todo.title.ilike(search_term),
-                    Todo.description.ilike(search_term)
-                )
-            )
+            query, rank = apply_todo_search(query, self._dialect_name, filters["search"])
         
-        # Order by
+        created_at, todo_id = Todo.createdAt, Todo.id
+        if filters.get("includeArchived") and status_value == "completed":
+            combined = union_all(query, self._archived_query(user_id, filters)).subquery("all_todos")
+            query = select(*combined.c)
+            created_at, todo_id = combined.c.createdAt, combined.c.id
+            rank = None  # archived rows have no relevance score
+        
+        # Order by: relevance for searches unless a date order was asked for;
+        # id breaks ties between todos created in the same instant
         order_by = filters.get("orderBy")
-        if order_by == "date-oldest":
-            query = query.order_by(Todo.createdAt.asc())
-        else:
-            query = query.order_by(Todo.createdAt.desc())
+        by_relevance = rank is not None and order_by in (None, "relevance")
+        sort_columns = [rank, created_at, todo_id] if by_relevance else [created_at, todo_id]
+        descending = by_relevance or order_by != "date-oldest"
+        query = query.order_by(*(col.desc() if descending else col.asc() for col in sort_columns))
         
+        limit = filters.get("limit")
+        cursor = filters.get("cursor")
+        if limit is None and cursor is None:
+            result = await self.session.execute(query)
+            return [self._to_payload(row) for row in result]
+
+        limit = limit or DEFAULT_PAGE_SIZE
+        if cursor:
+            sort_key = tuple_(*sort_columns)
+            after = self._decode_page_cursor(cursor, by_relevance)
+            query = query.where(sort_key < after if descending else sort_key > after)
+        if by_relevance:
+            # The cursor has to carry the score of the last row
+            query = query.add_columns(rank)
+
+        # Fetch one extra row to learn whether another page exists
+        result = await self.session.execute(query.limit(limit + 1))
+        rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            key = [last.createdAt.isoformat(), last.id]
+            next_cursor = encode_cursor([last[len(RESPONSE_COLUMNS)], *key] if by_relevance else key)
+
+        return {
+            "items": [self._to_payload(row) for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+    async def changes(self, user_id: str, sync_token: Optional[str] = None) -> dict:
+        """
+        Delta sync: todos created or updated, and ids deleted, since `sync_token`.
+        Without a token, or with one older than the tombstone retention, every
+        todo is returned with reset=True and the client replaces its copy.
+        The returned sync_token is the database clock at the start of the read.
+
+        Archived todos stay in a synced copy: a reset includes them, and a
+        delta needs nothing for them since archiving keeps updatedAt (and any
+        edit moves the todo back to `todos` with a new one).
+        """
+        result = await self.session.execute(select(func.now()))
+        now = result.scalar_one()
+        since = self._decode_sync_token(sync_token, now) if sync_token else None
+        reset = since is None or since < now - timedelta(days=settings.TODO_TOMBSTONE_RETENTION_DAYS)
+
+        query = select(*RESPONSE_COLUMNS).where(Todo.userId == user_id)
+        deleted = []
+        if reset:
+            combined = union_all(
+                query, select(*ARCHIVE_RESPONSE_COLUMNS).where(TodoArchive.userId == user_id)
+            ).subquery("all_todos")
+            query = select(*combined.c).order_by(combined.c.updatedAt, combined.c.id)
+        else:
+            since -= SYNC_OVERLAP
+            query = query.where(Todo.updatedAt > since).order_by(Todo.updatedAt, Todo.id)
+            deleted = await self.tombstones.deleted_since(user_id, since)
         result = await self.session.execute(query)
-        todos = result.scalars().all()
-        
-        return [
-            {
-                "id": todo.id,
-                "title": todo.title,
-                "description": todo.description,
-                "priority": todo.priority,
-                "category": todo.category,
-                "dueDate": todo.dueDate.isoformat() if todo.dueDate else None,
-                "completed": todo.completed,
-                "createdAt": todo.createdAt.isoformat(),
-                "updatedAt": todo.updatedAt.isoformat()
-            }
-            for todo in todos
-        ]
-    
-    async def find_one(self, user_id: str, todo_id: str) -> Optional[dict]:
-        """Find a specific todo by ID."""
-        stmt = select(Todo).where(
-            and_(Todo.id == todo_id, Todo.userId == user_id)
+
+        return {
+            "changes": [self._to_payload(row) for row in result],
+            "deleted": deleted,
+            "reset": reset,
+            "sync_token": encode_cursor([now.isoformat()]),
+        }
+
+    async def _delete_rows(self, model: Any, user_id: str, todo_ids: List[str]) -> List[Any]:
+        """Delete the user's todos in `model`'s table; returns their ids and counted fields."""
+        stmt = (
+            delete(model)
+            .where(model.userId == user_id, model.id.in_(todo_ids))
+            .execution_options(synchronize_session=False)
         )
-        result = await self.session.execute(stmt)
-        todo = result.scalar_one_or_none()
-        
-        if not todo:
-            return None
-            
+        returning = [model.id, *(getattr(model, field) for field in COUNTED_FIELDS)]
+        if self.session.bind.dialect.delete_returning:
+            result = await self.session.execute(stmt.returning(*returning))
+            return list(result.all())
+        result = await self.session.execute(
+            select(*returning).where(model.userId == user_id, model.id.in_(todo_ids))
+        )
+        rows = list(result.all())
+        if rows:
+            await self.session.execute(stmt)
+        return rows
+
+    @staticmethod
+    def _archived_query(user_id: str, filters: Dict[str, Any]) -> Any:
+        """find_all's filters applied to todos_archive (every archived todo is completed)."""
+        query = select(*ARCHIVE_RESPONSE_COLUMNS).where(TodoArchive.userId == user_id)
+        if filters.get("priority") and filters["priority"] != "all":
+            query = query.where(TodoArchive.priority == filters["priority"])
+        if filters.get("category") and filters["category"] != "all":
+            query = query.where(TodoArchive.category == filters["category"])
+        if filters.get("search"):
+            like = f"%{filters['search']}%"
+            query = query.where(or_(TodoArchive.title.ilike(like), TodoArchive.description.ilike(like)))
+        return query
+
+    async def _commit_write(
+        self, user_id: str, deltas: Optional[CounterDeltas] = None, events: Optional[List[dict]] = None
+    ) -> None:
+        """
+        Commit a write to the user's todos. Counter deltas and the user's data
+        version are applied in the same transaction; change events are pushed
+        to the user's subscribers once it has committed.
+        """
+        if deltas:
+            await self.counters.apply(user_id, deltas)
+        await self.users.bump_version(user_id)
+        notified = bool(events) and await todo_events.notify(self.session, user_id, events)
+        await self.session.commit()
+        if events and not notified:
+            todo_events.publish(user_id, events)
+
+    @staticmethod
+    def _event(kind: str, todo_id: str, todo: Any = None) -> dict:
+        """A push event ("created", "updated" or "deleted") for one todo."""
+        event = {"type": kind, "id": todo_id}
+        if todo is not None:
+            event["todo"] = TodoService._to_response(todo)
+        return event
+
+    @staticmethod
+    def _counter_deltas(todo: Any, sign: int = 1) -> Counter:
+        """Counter contributions of one todo (an ORM object, Row mapping or dict)."""
+        values = todo if isinstance(todo, Mapping) else {field: getattr(todo, field) for field in COUNTED_FIELDS}
+        deltas = Counter({
+            ("total", ""): sign,
+            ("priority", values["priority"]): sign,
+            ("category", values["category"]): sign,
+        })
+        if values["completed"]:
+            deltas[("completed", "")] += sign
+        return deltas
+
+    @property
+    def _dialect_name(self) -> str:
+        return self.session.bind.dialect.name
+
+    def _decode_page_cursor(self, cursor: str, with_rank: bool = False) -> tuple:
+        """Decode a page cursor back into its ([rank,] createdAt, id) sort key."""
+        try:
+            values = decode_cursor(cursor)
+            if with_rank:
+                rank, created_at, todo_id = values
+                return float(rank), datetime.fromisoformat(created_at), str(todo_id)
+            created_at, todo_id = values
+            return datetime.fromisoformat(created_at), str(todo_id)
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    def _new_row(self, user_id: str, model_data: dict) -> dict:
+        """Build the INSERT values for a new todo, applying the create-time due date rule."""
+        due_date = None
+        if model_data.get("dueDate"):
+            due_date = self._parse_due_date(model_data["dueDate"])
+            if due_date.date() < date.today():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Due date must be today or a future date"
+                )
+        return {
+            "id": str(uuid.uuid4()),
+            "userId": user_id,
+            "title": model_data["title"],
+            "description": model_data.get("description", ""),
+            "priority": model_data.get("priority", "medium"),
+            "category": model_data.get("category", "personal"),
+            "dueDate": due_date,
+            "completed": False,
+            "status": self._status(False, due_date),
+        }
+
+    @staticmethod
+    def _decode_sync_token(sync_token: str, now: datetime) -> datetime:
+        """Decode a sync token issued by `changes`, raising 400 if it is malformed."""
+        try:
+            (value,) = decode_cursor(sync_token)
+            since = datetime.fromisoformat(value)
+            if (since.tzinfo is None) != (now.tzinfo is None):
+                raise ValueError("Sync token from another database")
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync token"
+            )
+        return since
+
+    @staticmethod
+    def _status(completed: bool, due_date: Optional[datetime]) -> str:
+        """Materialized status of a todo as of today."""
+        if completed:
+            return "completed"
+        if due_date is not None and due_date < datetime.combine(date.today(), time.min):
+            return "overdue"
+        return "pending"
+
+    @staticmethod
+    def _status_expression(values: dict) -> Any:
+        """
+        Status for an UPDATE that sets `values`, as a SQL CASE when it also
+        depends on the stored completed/dueDate columns.
+        """
+        if "completed" in values and "dueDate" in values:
+            return TodoService._status(values["completed"], values["dueDate"])
+        if values.get("completed"):
+            return "completed"
+        completed = Todo.completed if "completed" not in values else literal(False)
+        due_date = Todo.dueDate if "dueDate" not in values else literal(values["dueDate"], Todo.dueDate.type)
+        today_midnight = datetime.combine(date.today(), time.min)
+        return case(
+            (completed == True, "completed"),
+            (due_date < today_midnight, "overdue"),
+            else_="pending",
+        )
+
+    @staticmethod
+    def _parse_due_date(value: Any) -> datetime:
+        """Parse a dueDate (date, datetime or ISO string) into the naive datetime we store."""
+        try:
+            if isinstance(value, date) and not isinstance(value, datetime):
+                return datetime.combine(value, time.min)
+            if isinstance(value, str):
+                if "T" in value or "Z" in value:
+                    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+                # Handle date-only strings like "2024-08-20"
+                # Parse as date and set to start of day WITHOUT timezone
+                return datetime.combine(date.fromisoformat(value), time.min)
+            return datetime.fromisoformat(str(value))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid date format"
+            )
+
+    def _update_values(self, model_data: dict) -> dict:
+        """Translate a TodoUpdate payload into column values."""
+        values = {
+            key: model_data[key]
+            for key in ("title", "description", "priority", "category", "completed")
+            if key in model_data
+        }
+        if "dueDate" in model_data:
+            values["dueDate"] = self._parse_due_date(model_data["dueDate"]) if model_data["dueDate"] else None
+        return values
+
+    @staticmethod
+    def _check_due_after_creation(due_date: Optional[datetime], created_at: datetime) -> None:
+        """Validate due date is not before creation date like backend."""
+        if due_date is not None and due_date.date() < created_at.date():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Due date must be same or after todo creation date."
+            )
+
+    @staticmethod
+    def _is_title_conflict(error: IntegrityError) -> bool:
+        """Whether an IntegrityError comes from the unique (title, userId) constraint."""
+        message = str(error.orig).lower()
+        # Postgres names the constraint; SQLite lists the columns instead
+        return "unique_title_per_user" in message or "unique constraint failed: todos.title" in message
+
+    @staticmethod
+    def _to_response(todo: Todo) -> dict:
+        """Convert a Todo row into the API response shape."""
         return {
             "id": todo.id,
             "title": todo.title,
@@ -170,71 +435,132 @@ class TodoService:
             "createdAt": todo.createdAt.isoformat(),
             "updatedAt": todo.updatedAt.isoformat()
         }
+
+    @staticmethod
+    def _to_payload(row: Any) -> dict:
+        """
+        Response dict for a Row selected with RESPONSE_COLUMNS (extra trailing
+        columns are ignored). Datetimes are left for orjson, which renders them
+        exactly like isoformat().
+        """
+        return dict(zip(RESPONSE_FIELDS, row))
     
-    async def update(self, user_id: str, todo_id: str, model_data: dict) -> Optional[dict]:
-        """Update a todo."""
-        stmt = select(Todo).where(
+    async def find_one(self, user_id: str, todo_id: str) -> Optional[dict]:
+        """Find a specific todo by ID."""
+        stmt = select(*RESPONSE_COLUMNS).where(
             and_(Todo.id == todo_id, Todo.userId == user_id)
         )
         result = await self.session.execute(stmt)
-        todo = result.scalar_one_or_none()
+        row = result.one_or_none()
+        if not row:
+            result = await self.session.execute(
+                select(*ARCHIVE_RESPONSE_COLUMNS).where(TodoArchive.id == todo_id, TodoArchive.userId == user_id)
+            )
+            row = result.one_or_none()
         
-        if not todo:
+        if not row:
+            return None
+            
+        return self._to_payload(row)
+    
+    async def update(self, user_id: str, todo_id: str, model_data: dict) -> Optional[dict]:
+        """
+        Update a todo. One the archiver has moved is moved back to `todos`
+        first, in the same transaction, so archived todos stay editable.
+        """
+        todo = await self._update_live(user_id, todo_id, model_data)
+        if todo is not None:
+            return todo
+        restored, blocked = await self._restore_archived(user_id, [todo_id])
+        if blocked:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Another todo with this title already exists."
+            )
+        if not restored:
             return None
-        
-        # Update fields
-        if "title" in model_data:
-            todo.title = model_data["title"]
-        if "description" in model_data:
-            todo.description = model_data["description"]
-        if "priority" in model_data:
-            todo.priority = model_data["priority"]
-        if "category" in model_data:
-            todo.category = model_data["category"]
-        if "completed" in model_data:
-            todo.completed = model_data["completed"]
-        if "dueDate" in model_data:
-            if model_data["dueDate"]:
-                try:
-                    value = model_data["dueDate"]
-                    if isinstance(value, date) and not isinstance(value, datetime):
-                        new_due_date = datetime.combine(value, time.min)
-                    elif isinstance(value, str):
-                        if "T" in value or "Z" in value:
-                            new_due_date = datetime.fromisoformat(value.replace("Z", "+00:00"))
-                        else:
-                            # Handle date-only strings like "2024-08-20"
-                            # Parse as date and set to start of day WITHOUT timezone
-                            parsed_date = date.fromisoformat(value)
-                            new_due_date = datetime.combine(parsed_date, time.min)
-                            # Store as naive datetime to avoid timezone issues
-                    else:
-                        new_due_date = datetime.fromisoformat(str(value))
-                    # Validate due date is not before creation date like backend
-                    created_date = todo.createdAt.date()
-                    new_due_date_only = new_due_date.date()
-                    
-                    if new_due_date_only < created_date:
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Due date must be same or after todo creation date."
-                        )
-                    
-                    todo.dueDate = new_due_date
-                except (ValueError, TypeError) as e:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Invalid date format"
-                    )
-            else:
-                todo.dueDate = None
-        
-        todo.updatedAt = datetime.utcnow()
         try:
-            await self.session.commit()
+            todo = await self._update_live(user_id, todo_id, model_data)
+        except HTTPException:
+            # Leave the todo archived when the update itself is rejected
+            await self.session.rollback()
+            raise
+        if todo is None:
+            await self.session.rollback()
+        return todo
+
+    async def _update_live(self, user_id: str, todo_id: str, model_data: dict) -> Optional[dict]:
+        """
+        Update a todo in `todos` with a single UPDATE ... RETURNING statement.
+        The ownership check and the due-date-after-creation rule are part of the
+        WHERE clause; only when no row matches is a second query needed to tell
+        a 404 from a 400.
+        """
+        values = self._update_values(model_data)
+        if "completed" in values or "dueDate" in values:
+            values["status"] = self._status_expression(values)
+        if "dueDate" in values:
+            values["remindedAt"] = None  # a new due date gets a new reminder
+        stmt = (
+            update(Todo)
+            .where(Todo.id == todo_id, Todo.userId == user_id)
+            .values(**values, updatedAt=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        due_date = values.get("dueDate")
+        if due_date is not None:
+            # Same rule as _check_due_after_creation: dueDate day >= createdAt day (UTC)
+            next_day = datetime.combine(due_date.date() + timedelta(days=1), time.min, tzinfo=timezone.utc)
+            stmt = stmt.where(Todo.createdAt < next_day)
+
+        returning = list(Todo.__table__.c)
+        counted = any(field in values for field in COUNTED_FIELDS)
+        use_returning = self.session.bind.dialect.update_returning
+        prior = None  # counted fields before the update, for the counters
+
+        try:
+            if counted and use_returning and self._dialect_name == "postgresql":
+                # WITH prior AS (SELECT ... FOR UPDATE) UPDATE todos ... FROM prior RETURNING todos.*, prior.*
+                # still a single statement, and the row lock makes the captured values exact
+                locked = (
+                    select(Todo.id, *(getattr(Todo, field) for field in COUNTED_FIELDS))
+                    .where(Todo.id == todo_id, Todo.userId == user_id)
+                    .with_for_update()
+                    .cte("prior")
+                )
+                stmt = stmt.where(Todo.id == locked.c.id)
+                returning += [locked.c[field].label(f"prior_{field}") for field in COUNTED_FIELDS]
+            elif counted:
+                # RETURNING cannot see other tables here (e.g. SQLite), so read the old values first
+                result = await self.session.execute(
+                    select(*(getattr(Todo, field) for field in COUNTED_FIELDS))
+                    .where(Todo.id == todo_id, Todo.userId == user_id)
+                    .with_for_update()
+                )
+                prior = result.one_or_none()
+
+            if use_returning:
+                result = await self.session.execute(stmt.returning(*returning))
+                row = result.one_or_none()
+            else:
+                result = await self.session.execute(stmt)
+                row = None
+                if result.rowcount:
+                    result = await self.session.execute(select(Todo.__table__).where(Todo.id == todo_id))
+                    row = result.one()
+
+            if row is not None:
+                todo = Todo(**{column.name: row._mapping[column.name] for column in Todo.__table__.c})
+                deltas = None
+                if counted:
+                    if prior is None:
+                        prior = {field: row._mapping[f"prior_{field}"] for field in COUNTED_FIELDS}
+                    deltas = self._counter_deltas(todo)
+                    deltas.subtract(self._counter_deltas(prior))
+                await self._commit_write(user_id, deltas, [self._event("updated", todo.id, todo)])
         except IntegrityError as e:
             await self.session.rollback()
-            if "unique_title_per_user" in str(e.orig).lower():
+            if self._is_title_conflict(e):
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="Another todo with this title already exists."
@@ -243,32 +569,440 @@ class TodoService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="An unexpected error occurred."
             )
-        await self.session.refresh(todo)
-        
-        return {
-            "id": todo.id,
-            "title": todo.title,
-            "description": todo.description,
-            "priority": todo.priority,
-            "category": todo.category,
-            "dueDate": todo.dueDate.isoformat() if todo.dueDate else None,
-            "completed": todo.completed,
-            "createdAt": todo.createdAt.isoformat(),
-            "updatedAt": todo.updatedAt.isoformat()
-        }
+
+        if row is None:
+            if due_date is not None:
+                result = await self.session.execute(
+                    select(Todo.createdAt).where(and_(Todo.id == todo_id, Todo.userId == user_id))
+                )
+                created_at = result.scalar_one_or_none()
+                if created_at is not None:
+                    self._check_due_after_creation(due_date, created_at)
+            return None
+
+        return self._to_response(todo)
     
-    async def delete(self, user_id: str, todo_id: str) -> bool:
-        """Delete a todo."""
-        stmt = select(Todo).where(
-            and_(Todo.id == todo_id, Todo.userId == user_id)
+    async def _restore_archived(self, user_id: str, todo_ids: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Move the user's archived todos among `todo_ids` back to `todos`, in the
+        caller's transaction. Returns the ids restored and the ids left in the
+        archive because a todo in `todos` now has their title.
+        """
+        result = await self.session.execute(
+            select(TodoArchive.id, TodoArchive.title)
+            .where(TodoArchive.userId == user_id, TodoArchive.id.in_(todo_ids))
+            .with_for_update()
         )
-        result = await self.session.execute(stmt)
-        todo = result.scalar_one_or_none()
-        
-        if not todo:
+        archived = result.all()
+        if not archived:
+            return [], []
+        result = await self.session.execute(
+            select(Todo.title).where(Todo.userId == user_id, Todo.title.in_({row.title for row in archived}))
+        )
+        taken = set(result.scalars())
+        restored, blocked = [], []
+        for row in archived:
+            if row.title in taken:
+                blocked.append(row.id)
+            else:
+                taken.add(row.title)
+                restored.append(row.id)
+        if restored:
+            await self.session.execute(
+                insert(Todo).from_select(
+                    ARCHIVED_COLUMNS,
+                    select(*(getattr(TodoArchive, name) for name in ARCHIVED_COLUMNS)).where(TodoArchive.id.in_(restored)),
+                )
+            )
+            await self.session.execute(delete(TodoArchive).where(TodoArchive.id.in_(restored)))
+        return restored, blocked
+
+    async def delete(self, user_id: str, todo_id: str) -> bool:
+        """
+        Delete a todo with a single DELETE ... RETURNING id statement, falling
+        back to the archive for todos the archiver has already moved.
+        """
+        rows = await self._delete_rows(Todo, user_id, [todo_id])
+        if not rows:
+            rows = await self._delete_rows(TodoArchive, user_id, [todo_id])
+        if not rows:
             return False
         
-        await self.session.delete(todo)
-        await self.session.commit()
-        
-        return True
\ No newline at end of file
+        row = rows[0]
+        await self.tombstones.record(user_id, [row.id])
+        await self._commit_write(user_id, self._counter_deltas(row._mapping, -1), [self._event("deleted", row.id)])
+        return True
+
+    async def create_many(self, user_id: str, items: List[dict]) -> List[dict]:
+        """
+        Create several todos in one transaction with a single multi-row INSERT.
+        Returns one result per item; duplicate titles are reported as 409 instead
+        of failing the whole batch.
+        """
+        results: List[Optional[dict]] = [None] * len(items)
+        pending = []
+        seen_titles = set()
+        for index, model_data in enumerate(items):
+            try:
+                row = self._new_row(user_id, model_data)
+            except HTTPException as e:
+                results[index] = self._batch_result(index, e.status_code, detail=e.detail)
+                continue
+            if row["title"] in seen_titles:
+                results[index] = self._batch_result(
+                    index, status.HTTP_409_CONFLICT, detail="A todo with this title already exists."
+                )
+                continue
+            seen_titles.add(row["title"])
+            pending.append((index, row))
+
+        inserted = await self._insert_ignoring_duplicates(user_id, [row for _, row in pending])
+        deltas = Counter()
+        events = []
+        for index, row in pending:
+            timestamps = inserted.get(row["id"])
+            if timestamps is None:
+                results[index] = self._batch_result(
+                    index, status.HTTP_409_CONFLICT, detail="A todo with this title already exists."
+                )
+                continue
+            todo = Todo(**row, createdAt=timestamps.createdAt, updatedAt=timestamps.updatedAt)
+            deltas.update(self._counter_deltas(row))
+            events.append(self._event("created", todo.id, todo))
+            results[index] = self._batch_result(index, status.HTTP_201_CREATED, todo=self._to_response(todo))
+        if inserted:
+            await self._commit_write(user_id, deltas, events)
+        return results
+
+    async def update_many(self, user_id: str, items: List[dict]) -> List[dict]:
+        """
+        Apply several partial updates in one transaction.
+        Rows are locked and loaded with one SELECT and written back with one
+        executemany UPDATE; title clashes are detected up front so a single
+        conflicting item does not abort the others.
+        """
+        ids = list({item["id"] for item in items})
+        result = await self.session.execute(
+            select(Todo.__table__).where(Todo.userId == user_id, Todo.id.in_(ids)).with_for_update()
+        )
+        rows = {row.id: dict(row._mapping) for row in result}
+        restored, blocked = [], []
+        missing = [todo_id for todo_id in ids if todo_id not in rows]
+        if missing:
+            # Archived todos are moved back to `todos` to be edited, as in update()
+            restored, blocked = await self._restore_archived(user_id, missing)
+            if restored:
+                result = await self.session.execute(
+                    select(Todo.__table__).where(Todo.id.in_(restored)).with_for_update()
+                )
+                rows.update({row.id: dict(row._mapping) for row in result})
+
+        # Who holds each title once the batch has been applied
+        title_owner = {row["title"]: row["id"] for row in rows.values()}
+        new_titles = {item["title"] for item in items if item.get("title")}
+        if new_titles:
+            result = await self.session.execute(
+                select(Todo.id, Todo.title).where(Todo.userId == user_id, Todo.title.in_(new_titles))
+            )
+            title_owner.update({title: todo_id for todo_id, title in result})
+
+        # The database clock, like every other write (and the delta sync token); one value for the batch
+        now = (await self.session.execute(select(func.now()))).scalar_one()
+        results = []
+        params = []
+        deltas = Counter()
+        for index, item in enumerate(items):
+            row = rows.get(item["id"])
+            if row is None and item["id"] in blocked:
+                results.append(self._batch_result(
+                    index, status.HTTP_409_CONFLICT, item["id"], detail="Another todo with this title already exists."
+                ))
+                continue
+            if row is None:
+                results.append(self._batch_result(index, status.HTTP_404_NOT_FOUND, item["id"], detail="Todo not found"))
+                continue
+            try:
+                values = self._update_values({k: v for k, v in item.items() if k != "id"})
+                if "dueDate" in values:
+                    self._check_due_after_creation(values["dueDate"], row["createdAt"])
+            except HTTPException as e:
+                results.append(self._batch_result(index, e.status_code, row["id"], detail=e.detail))
+                continue
+            new_title = values.get("title")
+            if new_title is not None and title_owner.get(new_title, row["id"]) != row["id"]:
+                results.append(self._batch_result(
+                    index, status.HTTP_409_CONFLICT, row["id"], detail="Another todo with this title already exists."
+                ))
+                continue
+            if new_title is not None:
+                if title_owner.get(row["title"]) == row["id"]:
+                    del title_owner[row["title"]]
+                title_owner[new_title] = row["id"]
+
+            deltas.subtract(self._counter_deltas(row))
+            values["status"] = self._status(values.get("completed", row["completed"]), values.get("dueDate", row["dueDate"]))
+            if "dueDate" in values:
+                values["remindedAt"] = None
+            row.update(values, updatedAt=now)
+            deltas.update(self._counter_deltas(row))
+            params.append({"id": row["id"], **values, "updatedAt": now})
+            results.append(self._batch_result(index, status.HTTP_200_OK, row["id"], todo=row))
+
+        if params:
+            try:
+                # ORM bulk UPDATE by primary key: one executemany per distinct column set
+                await self.session.execute(update(Todo), params)
+                events = [self._event("updated", item["id"], Todo(**rows[item["id"]])) for item in params]
+                await self._commit_write(user_id, deltas, events)
+            except IntegrityError:
+                # A concurrent write took one of the titles; fall back to item-by-item updates
+                await self.session.rollback()
+                return await self._update_one_by_one(user_id, items)
+        elif restored:
+            # Nothing to write after all: leave the restored todos archived
+            await self.session.rollback()
+
+        for item in results:
+            if item["todo"] is not None:
+                item["todo"] = self._to_response(Todo(**item["todo"]))
+        return results
+
+    async def delete_many(self, user_id: str, todo_ids: List[str]) -> List[dict]:
+        """Delete several todos with a single DELETE statement (plus one on the archive for misses)."""
+        rows = await self._delete_rows(Todo, user_id, todo_ids)
+        missing = set(todo_ids) - {row.id for row in rows}
+        if missing:
+            rows += await self._delete_rows(TodoArchive, user_id, list(missing))
+        if rows:
+            deltas = Counter()
+            for row in rows:
+                deltas.update(self._counter_deltas(row._mapping, -1))
+            await self.tombstones.record(user_id, [row.id for row in rows])
+            await self._commit_write(user_id, deltas, [self._event("deleted", row.id) for row in rows])
+
+        deleted = {row.id for row in rows}
+        return [
+            self._batch_result(index, status.HTTP_200_OK, todo_id)
+            if todo_id in deleted
+            else self._batch_result(index, status.HTTP_404_NOT_FOUND, todo_id, detail="Todo not found")
+            for index, todo_id in enumerate(todo_ids)
+        ]
+
+    async def get_stats(self, user_id: str) -> dict:
+        """
+        Todo statistics from the incrementally maintained counters.
+        Only the time-dependent overdue bucket is counted live, via the
+        (userId, status) index.
+        """
+        counters = await self.counters.get(user_id)
+        result = await self.session.execute(
+            select(func.count())
+            .select_from(Todo)
+            .where(Todo.userId == user_id, Todo.status == "overdue")
+        )
+        overdue = result.scalar_one()
+
+        total = counters.get(("total", ""), 0)
+        completed = counters.get(("completed", ""), 0)
+        by_dimension = {"priority": {}, "category": {}}
+        for (dimension, value), count in counters.items():
+            if dimension in by_dimension and count:
+                by_dimension[dimension][value] = count
+        return {
+            "total": total,
+            "completed": completed,
+            "pending": total - completed - overdue,
+            "overdue": overdue,
+            "byPriority": by_dimension["priority"],
+            "byCategory": by_dimension["category"],
+        }
+
+    async def export(self, user_id: str, export_format: str = "ndjson") -> AsyncIterator[Union[str, bytes]]:
+        """
+        Yield all of a user's todos, archived ones included, as NDJSON lines or
+        CSV, oldest first. Rows come from a server-side cursor in chunks of
+        EXPORT_BATCH_SIZE, so memory stays flat and the first chunk is sent
+        before the scan finishes.
+        """
+        combined = union_all(
+            select(*RESPONSE_COLUMNS).where(Todo.userId == user_id),
+            select(*ARCHIVE_RESPONSE_COLUMNS).where(TodoArchive.userId == user_id),
+        ).subquery("all_todos")
+        stmt = (
+            select(*combined.c)
+            .order_by(combined.c.createdAt, combined.c.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == "csv":
+            writer.writerow(RESPONSE_FIELDS)
+
+        result = await self.session.stream(stmt)
+        async for rows in result.partitions():
+            if export_format != "csv":
+                yield b"".join(orjson.dumps(self._to_payload(row)) + b"\n" for row in rows)
+                continue
+            for row in rows:
+                writer.writerow(self._to_response(row).values())
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if export_format == "csv" and buffer.tell():
+            # header only: the user has no todos
+            yield buffer.getvalue()
+
+    async def import_todos(self, user_id: str, chunks: AsyncIterator[bytes], import_format: str = "ndjson") -> dict:
+        """
+        Create todos from a streamed NDJSON or CSV body.
+        Records are parsed as they arrive, validated like TodoCreate and inserted
+        IMPORT_BATCH_SIZE at a time (COPY on Postgres), one transaction per batch.
+        Titles the user already has, or that repeat within the import, are
+        skipped in bulk via ON CONFLICT and reported as row errors.
+        """
+        records = iter_csv_records(chunks) if import_format == "csv" else iter_ndjson_records(chunks)
+        summary = {"received": 0, "created": 0, "failed": 0, "errors": []}
+
+        def fail(number: int, detail: str, title: Optional[str] = None) -> None:
+            summary["failed"] += 1
+            if len(summary["errors"]) < MAX_IMPORT_ERRORS:
+                summary["errors"].append({"row": number, "title": title, "detail": detail})
+
+        batch = []  # (record number, row)
+        try:
+            async for number, record in records:
+                summary["received"] += 1
+                if isinstance(record, Exception):
+                    fail(number, str(record))
+                    continue
+                if not isinstance(record, dict):
+                    fail(number, "Each record must be an object")
+                    continue
+                try:
+                    model_data = TodoCreate.model_validate(record).model_dump()
+                    batch.append((number, self._new_row(user_id, model_data)))
+                except ValidationError as e:
+                    fail(number, format_validation_errors(e.errors())[0]["message"], record.get("title"))
+                    continue
+                except HTTPException as e:
+                    fail(number, e.detail, record.get("title"))
+                    continue
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    summary["created"] += await self._import_batch(user_id, batch, fail)
+                    batch = []
+        except ValueError as e:
+            # Undecodable body: rows already committed stay, the rest of the stream is dropped
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{e} (after {summary['received']} records, {summary['created']} imported)"
+            )
+        if batch:
+            summary["created"] += await self._import_batch(user_id, batch, fail)
+        summary["errors"].sort(key=lambda error: error["row"])
+        return summary
+
+    async def _import_batch(self, user_id: str, batch: List[tuple], fail) -> int:
+        """Insert one import batch, report skipped titles through `fail` and commit."""
+        rows = [row for _, row in batch]
+        if self._dialect_name == "postgresql":
+            inserted = await self._copy_ignoring_duplicates(user_id, rows)
+        else:
+            inserted = await self._insert_ignoring_duplicates(user_id, rows)
+
+        deltas = Counter()
+        for number, row in batch:
+            if row["id"] in inserted:
+                deltas.update(self._counter_deltas(row))
+            else:
+                fail(number, "A todo with this title already exists.", row["title"])
+        if inserted:
+            # Imports are far past MAX_EVENTS_PER_WRITE; subscribers just resync
+            await self._commit_write(user_id, deltas, [RESYNC])
+        return len(inserted)
+
+    async def _copy_ignoring_duplicates(self, user_id: str, rows: List[dict]) -> set:
+        """
+        Postgres bulk path: COPY rows into a temp table, then move them over with
+        INSERT ... SELECT ... ON CONFLICT DO NOTHING. Returns the inserted ids.
+        """
+        # Executing through the session first opens the transaction the temp table lives in
+        await self.session.execute(text(
+            'CREATE TEMP TABLE todo_import (LIKE todos INCLUDING DEFAULTS EXCLUDING GENERATED) ON COMMIT DROP'
+        ))
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "todo_import",
+            records=[tuple(row[column] for column in IMPORT_COLUMNS) for row in rows],
+            columns=list(IMPORT_COLUMNS),
+        )
+        columns = ", ".join(f'"{column}"' for column in IMPORT_COLUMNS)
+        result = await self.session.execute(text(
+            f"INSERT INTO todos ({columns}) SELECT {columns} FROM todo_import "
+            'ON CONFLICT ("title", "userId") DO NOTHING RETURNING id'
+        ))
+        return set(result.scalars().all())
+
+    async def _insert_ignoring_duplicates(self, user_id: str, rows: List[dict]) -> Dict[str, Any]:
+        """
+        Insert rows with one multi-row INSERT, skipping titles the user already has.
+        Returns {id: Row(id, createdAt, updatedAt)} for the rows actually inserted.
+        """
+        if not rows:
+            return {}
+        returning = (Todo.id, Todo.createdAt, Todo.updatedAt)
+        dialect = self._dialect_name
+        if dialect in ("postgresql", "sqlite"):
+            insert_stmt = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = (
+                insert_stmt(Todo)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["title", "userId"])
+                .returning(*returning)
+            )
+            result = await self.session.execute(stmt)
+            return {row.id: row for row in result}
+
+        # No ON CONFLICT: filter out existing titles first
+        result = await self.session.execute(
+            select(Todo.title).where(Todo.userId == user_id, Todo.title.in_([row["title"] for row in rows]))
+        )
+        existing = set(result.scalars().all())
+        rows = [row for row in rows if row["title"] not in existing]
+        if not rows:
+            return {}
+        await self.session.execute(insert(Todo), rows)
+        result = await self.session.execute(select(*returning).where(Todo.id.in_([row["id"] for row in rows])))
+        return {row.id: row for row in result}
+
+    async def _update_one_by_one(self, user_id: str, items: List[dict]) -> List[dict]:
+        """Slow path for update_many: one transaction per item."""
+        results = []
+        for index, item in enumerate(items):
+            try:
+                todo = await self.update(user_id, item["id"], {k: v for k, v in item.items() if k != "id"})
+            except HTTPException as e:
+                results.append(self._batch_result(index, e.status_code, item["id"], detail=e.detail))
+                continue
+            if todo is None:
+                results.append(self._batch_result(index, status.HTTP_404_NOT_FOUND, item["id"], detail="Todo not found"))
+            else:
+                results.append(self._batch_result(index, status.HTTP_200_OK, item["id"], todo=todo))
+        return results
+
+    @staticmethod
+    def _batch_result(
+        index: int,
+        status_code: int,
+        todo_id: Optional[str] = None,
+        detail: Optional[str] = None,
+        todo: Optional[dict] = None,
+    ) -> dict:
+        """Per-item outcome of a batch operation."""
+        return {
+            "index": index,
+            "id": todo_id if todo_id is not None else (todo or {}).get("id"),
+            "status": status_code,
+            "detail": detail,
+            "todo": todo,
+        }
@@ -0,0 +1,69 @@
+"""
+Overdue sweeper: flips pending todos whose due day has passed to overdue.
+
+Runs inside the app lifespan, once at startup (to catch up after downtime) and
+then just after every local midnight. Each worker may run one; batches lock
+rows with SKIP LOCKED, so concurrent sweeps split the work instead of blocking.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.api.users.repository import UsersRepository
+from app.core.tasks import PeriodicTask
+from app.db.models.todo import Todo
+
+logger = logging.getLogger(__name__)
+
+# Rows flipped (and committed) per UPDATE
+SWEEP_BATCH_SIZE = 1000
+# Start a little after midnight so date.today() has rolled over
+SWEEP_DELAY = timedelta(seconds=5)
+
+
+async def sweep_overdue(session: AsyncSession, today: Optional[date] = None) -> int:
+    """Mark pending todos due before `today` as overdue; returns the number flipped."""
+    today_midnight = datetime.combine(today or date.today(), time.min)
+    users = UsersRepository(session)
+    flipped = 0
+    while True:
+        # Walks the partial (dueDate) WHERE status = 'pending' index
+        batch = (
+            select(Todo.id)
+            .where(Todo.status == "pending", Todo.dueDate < today_midnight)
+            .limit(SWEEP_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            update(Todo)
+            .where(Todo.id.in_(batch), Todo.status == "pending")
+            # Not a content change: keep updatedAt so delta sync does not re-send these
+            .values(status="overdue", updatedAt=Todo.updatedAt)
+            .returning(Todo.userId)
+            .execution_options(synchronize_session=False)
+        )
+        user_ids = result.scalars().all()
+        # Status filters and the overdue count changed, so cached ETags must go
+        await users.bump_versions(sorted(set(user_ids)))
+        await session.commit()
+        flipped += len(user_ids)
+        if len(user_ids) < SWEEP_BATCH_SIZE:
+            return flipped
+
+
+class OverdueSweeper(PeriodicTask):
+    """Background task running `sweep_overdue` at startup and after each midnight."""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def tick(self) -> None:
+        async with self.session_factory() as session:
+            flipped = await sweep_overdue(session)
+        if flipped:
+            logger.info("Marked %d todos overdue", flipped)
+
+    def _seconds_until_next_run(self) -> float:
+        next_run = datetime.combine(date.today() + timedelta(days=1), time.min) + SWEEP_DELAY
+        return (next_run - datetime.now()).total_seconds()
@@ -0,0 +1,123 @@
+"""
+Avatar garbage collector: deletes files in UPLOAD_DIR that no user references.
+
+Orphans are content-addressed files (and their variants) whose avatar_files
+row is unreferenced or missing (an upload that failed to commit), per-user
+files from before content addressing that their user no longer has, and
+temporary files left by interrupted uploads. Files modified within the grace
+period (AVATAR_GC_GRACE_HOURS) are never touched, so uploads in flight are
+safe; the check is repeated right before each unlink, so a file rewritten
+by an identical upload after the scan survives. Anything else in the
+directory is left alone.
+
+The directory is streamed with os.scandir in batches of GC_BATCH_SIZE, and
+each batch is checked with one or two `IN (...)` queries, so memory stays
+bounded for any number of files and users. Runs from `python -m app.cli
+purge-orphaned-avatars` or, with AVATAR_GC, inside the app lifespan every
+GC_INTERVAL.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.api.users.repository import AvatarFilesRepository, UsersRepository
+from app.core.config import settings
+from app.core.tasks import PeriodicTask
+from app.services.file_service import CONTENT_ADDRESSED_FILE, PER_USER_FILE, TEMP_PREFIX, FileService
+from app.utils.images import TEMP_VARIANT_PREFIX
+
+logger = logging.getLogger(__name__)
+
+GC_BATCH_SIZE = 1000
+GC_INTERVAL = timedelta(days=1)
+
+
+@dataclass
+class AvatarGcReport:
+    scanned: int = 0
+    # Files removed (in a dry run: that would be removed) and their total size
+    orphaned: int = 0
+    orphanedBytes: int = 0
+    # Unreferenced avatar_files rows deleted (would be deleted)
+    rows: int = 0
+
+
+async def collect_orphaned_avatars(
+    session_factory: async_sessionmaker,
+    grace: timedelta,
+    dry_run: bool = False,
+    on_orphan: Optional[Callable[[str, int], None]] = None,
+) -> AvatarGcReport:
+    """
+    Delete orphaned avatar files older than `grace` (report them only, with
+    `dry_run`). `on_orphan(filename, size)` is called for each one.
+    """
+    files = FileService()
+    report = AvatarGcReport()
+    cutoff = time.time() - grace.total_seconds()
+    async for batch in files.scan_uploads(GC_BATCH_SIZE):
+        report.scanned += len(batch)
+        by_hash: Dict[str, List[Tuple[str, int]]] = {}
+        by_user: Dict[str, List[Tuple[str, str, int]]] = {}
+        orphans: List[Tuple[str, int]] = []
+        for name, mtime, size in batch:
+            if mtime >= cutoff:
+                continue
+            if match := CONTENT_ADDRESSED_FILE.match(name):
+                by_hash.setdefault(match.group(1), []).append((name, size))
+            elif match := PER_USER_FILE.match(name):
+                by_user.setdefault(match.group(2), []).append((match.group(1), name, size))
+            elif name.startswith((TEMP_PREFIX, TEMP_VARIANT_PREFIX)):
+                orphans.append((name, size))
+
+        async with session_factory() as session:
+            if by_hash:
+                avatar_files = AvatarFilesRepository(session)
+                counts = await avatar_files.ref_counts(list(by_hash))
+                unreferenced = [digest for digest, count in counts.items() if count == 0]
+                if unreferenced and not dry_run:
+                    # Conditional delete: a file acquired since the count above keeps its row and files
+                    unreferenced = await avatar_files.delete_unreferenced(unreferenced)
+                    await session.commit()
+                report.rows += len(unreferenced)
+                for digest in [*unreferenced, *(digest for digest in by_hash if digest not in counts)]:
+                    orphans.extend(by_hash[digest])
+            if by_user:
+                avatars = await UsersRepository(session).get_avatars(list(by_user))
+                for user_id, names in by_user.items():
+                    avatar = avatars.get(user_id)
+                    current = avatar.rsplit("/", 1)[-1].rsplit(".", 1)[0] if avatar else None
+                    orphans.extend((name, size) for stem, name, size in names if stem != current)
+
+        if orphans and not dry_run:
+            # Rows are gone by now; an identical upload since the scan rewrites its file
+            # (and inserts a new row), so anything modified after the cutoff is kept
+            removed = set(await files.remove_files((name for name, _ in orphans), modified_before=cutoff))
+            orphans = [(name, size) for name, size in orphans if name in removed]
+        for name, size in orphans:
+            report.orphaned += 1
+            report.orphanedBytes += size
+            if on_orphan is not None:
+                on_orphan(name, size)
+    return report
+
+
+class AvatarCollector(PeriodicTask):
+    """Background task running `collect_orphaned_avatars` every GC_INTERVAL."""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self.session_factory = session_factory
+
+    async def tick(self) -> None:
+        grace = timedelta(hours=settings.AVATAR_GC_GRACE_HOURS)
+        report = await collect_orphaned_avatars(self.session_factory, grace)
+        if report.orphaned:
+            logger.info(
+                "Removed %d orphaned avatar files (%d bytes) of %d scanned",
+                report.orphaned, report.orphanedBytes, report.scanned,
+            )
+
+    def _seconds_until_next_run(self) -> float:
+        return GC_INTERVAL.total_seconds()
@@ -1,6 +1,8 @@
-from typing import Optional
-from sqlalchemy import select
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.avatar_file import AvatarFile
 from app.db.models.user import User
 
 class UsersRepository:
@@ -13,6 +15,16 @@ class UsersRepository:
         result = await self.session.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
 
+    async def get_data_version(self, user: User) -> int:
+        """
+        The user's current dataVersion, for ETags. Free when `user` was loaded
+        through this session; a cached (detached) user may be stale, so it is read.
+        """
+        if user in self.session:
+            return user.dataVersion
+        result = await self.session.execute(select(User.dataVersion).where(User.id == user.id))
+        return result.scalar_one()
+
     async def get_by_email(self, email: str) -> Optional[User]:
         result = await self.session.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
@@ -25,4 +37,89 @@ class UsersRepository:
             setattr(user, k, v)
         await self.session.commit()
         await self.session.refresh(user)
-        return user
\ No newline at end of file
+        return user
+
+    async def get_avatars(self, user_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Stored avatar of each of these users that exists."""
+        result = await self.session.execute(select(User.id, User.avatar).where(User.id.in_(user_ids)))
+        return dict(result.all())
+
+    async def bump_version(self, user_id: str) -> None:
+        """Invalidate the user's ETags; runs in the caller's transaction, caller commits."""
+        await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(dataVersion=User.dataVersion + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def bump_versions(self, user_ids: List[str]) -> None:
+        """`bump_version` for several users at once (e.g. after a background job); caller commits."""
+        if user_ids:
+            await self.session.execute(
+                update(User)
+                .where(User.id.in_(user_ids))
+                .values(dataVersion=User.dataVersion + 1)
+                .execution_options(synchronize_session=False)
+            )
+
+
+class AvatarFilesRepository:
+    """Reference counts of content-addressed avatar files; every method runs in the caller's transaction."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def acquire(self, digest: str) -> Optional[str]:
+        """Add a reference to a stored file; returns its extension, or None if it is not stored yet."""
+        result = await self.session.execute(
+            update(AvatarFile)
+            .where(AvatarFile.hash == digest)
+            .values(refCount=AvatarFile.refCount + 1, updatedAt=func.now())
+            .returning(AvatarFile.extension)
+        )
+        return result.scalar_one_or_none()
+
+    async def add(self, digest: str, extension: str) -> None:
+        """Record a newly written file with one reference (or add one, if a concurrent upload recorded it first)."""
+        dialect = self.session.bind.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert_stmt = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            await self.session.execute(
+                insert_stmt(AvatarFile)
+                .values(hash=digest, extension=extension, refCount=1)
+                .on_conflict_do_update(
+                    index_elements=["hash"],
+                    set_={"refCount": AvatarFile.refCount + 1, "updatedAt": func.now()},
+                )
+            )
+            return
+        if await self.acquire(digest) is None:
+            self.session.add(AvatarFile(hash=digest, extension=extension, refCount=1))
+
+    async def release(self, digest: str) -> None:
+        """Drop a reference; the file stays on disk, so a later identical upload costs no write."""
+        await self.session.execute(
+            update(AvatarFile)
+            .where(AvatarFile.hash == digest, AvatarFile.refCount > 0)
+            .values(refCount=AvatarFile.refCount - 1, updatedAt=func.now())
+        )
+
+    async def ref_counts(self, digests: List[str]) -> Dict[str, int]:
+        """Reference count of each of these files that has a row."""
+        result = await self.session.execute(
+            select(AvatarFile.hash, AvatarFile.refCount).where(AvatarFile.hash.in_(digests))
+        )
+        return dict(result.all())
+
+    async def delete_unreferenced(self, digests: List[str]) -> List[str]:
+        """
+        Delete the rows of these files that still have no reference; returns
+        the hashes deleted. A file acquired concurrently keeps its row.
+        """
+        result = await self.session.execute(
+            delete(AvatarFile)
+            .where(AvatarFile.hash.in_(digests), AvatarFile.refCount == 0)
+            .returning(AvatarFile.hash)
+        )
+        return list(result.scalars())
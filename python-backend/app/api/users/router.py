@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, Request, UploadFile, File, Form
+from fastapi import APIRouter, Depends, Request, Response, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.db.session import get_db
 from app.db.models.user import User
-from app.core.security import get_current_user
+from app.core.security import get_current_user, get_user_db
 from app.core.api_key_guard import verify_api_key
+from app.core.http_cache import compute_etag, etag_matches, not_modified, set_cache_headers
 from app.api.users.service import UserService
+from app.api.users.repository import UsersRepository
 from app.api.users.schemas import UserResponse
 
 router = APIRouter(prefix="/user", tags=["User"], dependencies=[Depends(verify_api_key)])
 
 @router.get("/me", response_model=UserResponse)
-async def get_profile(request: Request, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Get user profile with fully constructed avatar URL."""
+async def get_profile(request: Request, response: Response, db: AsyncSession = Depends(get_user_db), current_user: User = Depends(get_current_user)):
+    """Get user profile with fully constructed avatar URL (supports If-None-Match / 304)."""
+    # The avatar URL is built from the request's base URL, so it is part of the variant
+    data_version = await UsersRepository(db).get_data_version(current_user)
+    etag = compute_etag(current_user.id, data_version, request.base_url)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
+
     user_service = UserService(db)
     return await user_service.get_me(current_user.id, request)
 
@@ -22,7 +30,7 @@ async def update_profile(
     name: Optional[str] = Form(None),
     bio: Optional[str] = Form(None),
     avatar: Optional[UploadFile] = File(None),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_user_db),
     current_user: User = Depends(get_current_user),
 ):
     user_service = UserService(db)
@@ -8,6 +8,8 @@ class UserResponse(BaseModel):
     email: str
     name: str
     avatar: Optional[str] = None
+    avatarSrcset: Optional[str] = None
+    avatarFallback: Optional[str] = None
     bio: Optional[str] = None
     createdAt: datetime
 
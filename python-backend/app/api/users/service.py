@@ -1,11 +1,14 @@
 from fastapi import HTTPException, status, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
-import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from app.core.config import settings
 from app.db.models.user import User
 from app.api.users.schemas import UserResponse
-from app.api.users.repository import UsersRepository
-from app.services.file_service import FileService
+from app.api.users.repository import AvatarFilesRepository, UsersRepository
+from app.core.user_cache import user_cache
+from app.services.file_service import FileService, avatar_index
+from app.services.image_service import AVATAR_VARIANT_SIZES, has_variants
 
 class UserService:
     """User service."""
@@ -14,11 +17,13 @@ class UserService:
         """Initializes the service with a database session and a repository."""
         self.session = session
         self.repository = UsersRepository(session)
+        self.avatar_files = AvatarFilesRepository(session)
         self.files = FileService()
     
     def _construct_avatar_url(self, user_avatar: Optional[str], request: Request) -> Optional[str]:
         """
-        A helper function to safely construct the full avatar URL.
+        A helper function to safely construct the full avatar URL, without
+        filesystem I/O (per-user uploads are checked in the known-avatar index).
         """
         if not user_avatar:
             # Fallback: let frontend render placeholder; return null
@@ -28,18 +33,63 @@ class UserService:
         if user_avatar.startswith("http://") or user_avatar.startswith("https://"):
             return user_avatar
 
-        # If a relative path slipped in, attempt to construct a URL if file exists
-        local_path = f"static/{user_avatar}"
-        if not os.path.exists(local_path):
-            return None
+        # Content-addressed avatars ('avatars/<hash>.<ext>') exist while referenced: no disk check
+        filename = user_avatar.rsplit("/", 1)[-1]
+        if self.files.content_hash(filename):
+            return str(request.url_for("avatars", path=filename))
+
+        # An older per-user upload: only if the file is still there
+        if self._local_avatar_filename(user_avatar):
+            if not avatar_index.exists(self.files.upload_dir / filename):
+                return None
+            return str(request.url_for("avatars", path=filename))
         return str(request.url_for("static", path=user_avatar))
 
+    def _local_avatar_filename(self, user_avatar: str) -> Optional[str]:
+        """Filename of an avatar in the upload dir, from its static URL or relative path (None if external)."""
+        path = urlsplit(user_avatar).path
+        folder = f"{self.files.upload_dir.name}/"
+        if path.startswith(folder) or f"/static/{folder}" in path:
+            return path.rsplit("/", 1)[-1]
+        return None
+
+    def _avatar_variant_urls(self, user_avatar: Optional[str], request: Request) -> Dict[str, str]:
+        """URLs of the resized variants of an uploaded avatar, keyed like FileService.variant_filenames."""
+        filename = self._local_avatar_filename(user_avatar) if user_avatar else None
+        if not filename or not has_variants(filename):
+            return {}
+        names = self.files.variant_filenames(filename)
+        # Content-addressed avatars always have them; older uploads may predate variants
+        if not self.files.content_hash(filename) and not avatar_index.exists(self.files.upload_dir / names["fallback"]):
+            return {}
+        return {key: str(request.url_for("avatars", path=name)) for key, name in names.items()}
+
+    def _avatar_fields(self, user_avatar: Optional[str], request: Request) -> dict:
+        """
+        Avatar URLs for a profile response: `avatar` is the AVATAR_DEFAULT_SIZE
+        WebP variant, `avatarSrcset` lists every WebP size and `avatarFallback`
+        is the JPEG. Without variants (SVGs, Google pictures, older uploads)
+        `avatar` is the original and the other two are null.
+        """
+        variants = self._avatar_variant_urls(user_avatar, request)
+        if not variants:
+            return {
+                "avatar": self._construct_avatar_url(user_avatar, request),
+                "avatarSrcset": None,
+                "avatarFallback": None,
+            }
+        return {
+            "avatar": variants[str(settings.AVATAR_DEFAULT_SIZE)],
+            "avatarSrcset": ", ".join(f"{variants[str(size)]} {size}w" for size in AVATAR_VARIANT_SIZES),
+            "avatarFallback": variants["fallback"],
+        }
+
     def _convert_to_user_response(self, user: User, request: Request) -> UserResponse:
         return {
             "id": user.id,
             "email": user.email,
             "name": user.name,
-            "avatar": self._construct_avatar_url(user.avatar, request),
+            **self._avatar_fields(user.avatar, request),
             "bio": user.bio,
             "createdAt": user.createdAt.isoformat()
         }
@@ -68,25 +118,40 @@ class UserService:
             if model_data.get("bio") is not None:
                 user.bio = model_data["bio"]
 
+            previous_avatar = user.avatar
+            previous_hash = self.files.content_hash(previous_avatar.rsplit("/", 1)[-1]) if previous_avatar else None
+
             # Handle explicit avatar removal from form (avatar="")
-            if model_data.get("avatar") == "":
-                if user.avatar:
-                    # Delete by filename regardless of stored format (URL or relative)
-                    self.files.delete_avatar(user.avatar)
+            removed = model_data.get("avatar") == ""
+            if removed:
                 user.avatar = None
 
             if avatar:
-                # Delete old avatar if exists (works for full URL or relative path)
-                if user.avatar:
-                    self.files.delete_avatar(user.avatar)
+                # Identical images are stored once: a duplicate costs one hash and one update
+                digest, extension = await self.files.hash_avatar(avatar)
+                stored_extension = await self.avatar_files.acquire(digest)
+                if stored_extension is None:
+                    await self.files.save_avatar(avatar, digest, extension)
+                    await self.avatar_files.add(digest, extension)
+                    stored_extension = extension
+                # Relative path like 'avatars/<hash>.<ext>'; URLs are built per request
+                user.avatar = f"{self.files.upload_dir.name}/{digest}{stored_extension}"
 
-                # Save new avatar (returns relative path like 'avatars/<filename>')
-                saved_rel_path = await self.files.save_avatar(avatar, user.id)
-                # Convert to full static URL and store in DB
-                user.avatar = str(request.url_for("static", path=saved_rel_path))
+            # Re-uploading the current image takes a reference above and gives it back here
+            if previous_hash and (avatar or removed):
+                await self.avatar_files.release(previous_hash)
 
+            # Invalidate ETags of the profile
+            user.dataVersion = User.dataVersion + 1
             await self.session.commit()
+            user_cache.invalidate(user.id)
             await self.session.refresh(user)
+
+            # A replaced per-user avatar from before content addressing (and its variants)
+            # goes once the new one is committed; content-addressed files stay for reuse
+            if previous_avatar and not previous_hash and previous_avatar != user.avatar:
+                # Delete by filename regardless of stored format (URL or relative)
+                await self.files.delete_avatar(previous_avatar)
             
             return self._convert_to_user_response(user, request)
         except HTTPException as he:
@@ -101,10 +166,8 @@ class UserService:
             )
 
     async def _get_user_by_id(self, user_id: str) -> Optional[User]:
-        """Get user by ID."""
-        from sqlalchemy import select
-        result = await self.session.execute(select(User).where(User.id == user_id))
-        return result.scalar_one_or_none()
+        """Get user by ID, reusing the instance get_current_user loaded into this session."""
+        return await self.session.get(User, user_id)
 
     async def get_me(self, user_id: str, request: Request) -> UserResponse:
         """Get user profile."""
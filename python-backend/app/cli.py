@@ -0,0 +1,116 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli rebuild-todo-stats [--user-id USER_ID]
+    python -m app.cli purge-todo-tombstones [--days DAYS]
+    python -m app.cli sweep-overdue-todos
+    python -m app.cli archive-completed-todos [--days DAYS]
+    python -m app.cli purge-refresh-tokens
+    python -m app.cli purge-orphaned-avatars [--grace-hours HOURS] [--dry-run]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+import app.db.models.user  # noqa: F401  (registers the User mapper for Todo.user)
+from app.api.todos.repository import TodoCountersRepository, TodoTombstonesRepository
+from app.api.todos.sweeper import sweep_overdue
+from app.api.todos.archiver import archive_completed
+from app.api.auth.repository import AuthRepository
+from app.api.users.avatar_gc import collect_orphaned_avatars
+
+
+async def rebuild_todo_stats(user_id: str | None) -> None:
+    """Recompute the /todos/stats counters from the todos table."""
+    async with AsyncSessionLocal() as session:
+        rows = await TodoCountersRepository(session).rebuild(user_id)
+        await session.commit()
+    scope = f"user {user_id}" if user_id else "all users"
+    print(f"Rebuilt todo stats for {scope} ({rows} counter rows)")
+
+
+async def purge_todo_tombstones(days: int) -> None:
+    """Drop delta sync tombstones older than `days`; older sync tokens already get a full reset."""
+    before = datetime.now(timezone.utc) - timedelta(days=days)
+    async with AsyncSessionLocal() as session:
+        rows = await TodoTombstonesRepository(session).purge(before)
+        await session.commit()
+    print(f"Purged {rows} todo tombstones older than {days} days")
+
+
+async def sweep_overdue_todos() -> None:
+    """Flip pending todos due before today to overdue (what the in-app sweeper does at midnight)."""
+    async with AsyncSessionLocal() as session:
+        flipped = await sweep_overdue(session)
+    print(f"Marked {flipped} todos overdue")
+
+
+async def archive_completed_todos(days: int) -> None:
+    """Move completed todos untouched for `days` into todos_archive (what the in-app archiver does hourly)."""
+    before = datetime.now(timezone.utc) - timedelta(days=days)
+    async with AsyncSessionLocal() as session:
+        moved = await archive_completed(session, before)
+    print(f"Archived {moved} completed todos older than {days} days")
+
+
+async def purge_refresh_tokens() -> None:
+    """Delete expired and revoked refresh tokens (what the in-app purger does hourly)."""
+    async with AsyncSessionLocal() as session:
+        deleted = await AuthRepository(session).cleanup_expired_tokens()
+    print(f"Purged {deleted} expired or revoked refresh tokens")
+
+
+async def purge_orphaned_avatars(grace_hours: int, dry_run: bool) -> None:
+    """Delete avatar files no user references (what the in-app collector does daily, with AVATAR_GC)."""
+    on_orphan = (lambda name, size: print(f"{name}\t{size}")) if dry_run else None
+    report = await collect_orphaned_avatars(AsyncSessionLocal, timedelta(hours=grace_hours), dry_run, on_orphan)
+    verb = "Would remove" if dry_run else "Removed"
+    print(
+        f"{verb} {report.orphaned} orphaned avatar files ({report.orphanedBytes} bytes) "
+        f"and {report.rows} avatar_files rows; scanned {report.scanned} files"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-todo-stats", help="Recompute per-user todo counters")
+    rebuild.add_argument("--user-id", help="Only rebuild this user's counters")
+
+    purge = commands.add_parser("purge-todo-tombstones", help="Delete expired delta sync tombstones")
+    purge.add_argument("--days", type=int, default=settings.TODO_TOMBSTONE_RETENTION_DAYS,
+                       help="Retention in days (default: TODO_TOMBSTONE_RETENTION_DAYS)")
+
+    commands.add_parser("sweep-overdue-todos", help="Mark pending todos past their due day as overdue")
+
+    archive = commands.add_parser("archive-completed-todos", help="Move old completed todos to todos_archive")
+    archive.add_argument("--days", type=int, default=settings.TODO_ARCHIVE_AFTER_DAYS,
+                         help="Archive after this many days untouched (default: TODO_ARCHIVE_AFTER_DAYS)")
+
+    commands.add_parser("purge-refresh-tokens", help="Delete expired and revoked refresh tokens")
+
+    avatars = commands.add_parser("purge-orphaned-avatars", help="Delete avatar files no user references")
+    avatars.add_argument("--grace-hours", type=int, default=settings.AVATAR_GC_GRACE_HOURS,
+                         help="Keep files modified within this many hours (default: AVATAR_GC_GRACE_HOURS)")
+    avatars.add_argument("--dry-run", action="store_true", help="List orphaned files without deleting anything")
+
+    args = parser.parse_args(argv)
+    if args.command == "rebuild-todo-stats":
+        asyncio.run(rebuild_todo_stats(args.user_id))
+    elif args.command == "purge-todo-tombstones":
+        asyncio.run(purge_todo_tombstones(args.days))
+    elif args.command == "sweep-overdue-todos":
+        asyncio.run(sweep_overdue_todos())
+    elif args.command == "archive-completed-todos":
+        asyncio.run(archive_completed_todos(args.days))
+    elif args.command == "purge-refresh-tokens":
+        asyncio.run(purge_refresh_tokens())
+    elif args.command == "purge-orphaned-avatars":
+        asyncio.run(purge_orphaned_avatars(args.grace_hours, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str  # Async URL for APIs
     DATABASE_SYNC_URL: str  # Sync URL for Alembic
+    # Read replicas for GET requests (comma-separated async URLs); reads stay on the
+    # primary for a user for DATABASE_READ_STICKY_SECONDS after they write
+    DATABASE_READ_URL: Optional[str] = None
+    DATABASE_READ_STICKY_SECONDS: float = 5.0
     
     # Security
     ACCESS_TOKEN_SECRET: str
@@ -19,15 +23,62 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE: str = "30m"
     REFRESH_TOKEN_EXPIRE: str = "7d"
     
+    # Purge expired and revoked refresh tokens hourly from within the app
+    # (disable if a cron job runs `python -m app.cli purge-refresh-tokens`)
+    REFRESH_TOKEN_PURGE: bool = True
+    
+    # Keep decoded tokens in process until they expire, so repeated bearer tokens skip jwt.decode
+    JWT_CACHE_ENABLED: bool = True
+    JWT_CACHE_SIZE: int = 10000
+    
+    # Cache authenticated users in process (per worker) for this long, up to USER_CACHE_SIZE users.
+    # Profile updates and logouts only clear the entry in the worker that served them, so with
+    # several workers the others may serve the old profile for up to the TTL: a shorter TTL means
+    # fresher profiles and more user lookups (disable to load the user on every request)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    
+    # Delta sync: tombstones of deleted todos are kept this long; older sync tokens get a full reset
+    TODO_TOMBSTONE_RETENTION_DAYS: int = 30
+    
+    # Relay todo push events between workers via Postgres LISTEN/NOTIFY (single worker needs none)
+    TODO_EVENTS_PG_NOTIFY: bool = False
+    
+    # Run the pending -> overdue todo sweeper in the app (disable if a cron job runs `python -m app.cli sweep-overdue-todos`)
+    TODO_OVERDUE_SWEEPER: bool = True
+    
+    # Due-date reminders: run the scheduler in the app, and where to send reminders
+    # (comma-separated: log, webhook, notification)
+    TODO_REMINDERS: bool = True
+    TODO_REMINDER_SINKS: str = "log"
+    TODO_REMINDER_WEBHOOK_URL: Optional[str] = None
+    
+    # Move completed todos untouched for this many days to todos_archive (0 disables the archiver)
+    TODO_ARCHIVE_AFTER_DAYS: int = 180
+    
     # Google OAuth
     GOOGLE_CLIENT_ID: Optional[str] = None
     GOOGLE_CLIENT_SECRET: Optional[str] = None
     GOOGLE_REDIRECT_URI: Optional[str] = None
+    # OIDC discovery document; endpoints and signing keys are read from it (and cached)
+    GOOGLE_DISCOVERY_URL: str = "https://accounts.google.com/.well-known/openid-configuration"
     
     # File Upload
     MAX_FILE_SIZE: int = 2 * 1024 * 1024 # 2MB
     UPLOAD_DIR: str = "static/avatars"
     ALLOWED_EXTENSIONS: str = "jpg,jpeg,png,gif,svg"
+    # Square WebP variants rendered for raster avatars (px); the default size is
+    # the `avatar` URL in profile responses and also gets a JPEG fallback
+    AVATAR_VARIANT_SIZES: str = "64,128,256"
+    AVATAR_DEFAULT_SIZE: int = 128
+    # Worker processes resizing avatars
+    AVATAR_IMAGE_WORKERS: int = 2
+    # Index the avatar files at startup so profile responses need no stat calls
+    AVATAR_INDEX: bool = True
+    # Delete unreferenced avatar files daily from within the app; files younger than the grace period are kept
+    AVATAR_GC: bool = False
+    AVATAR_GC_GRACE_HOURS: int = 24
     
     class Config:
         env_file = ".env"
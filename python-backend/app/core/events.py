@@ -0,0 +1,171 @@
+"""
+Per-user push of todo change events.
+
+TodoService hands the events of each committed write to `todo_events`. Within
+one process they go straight to the subscribers' queues; with
+TODO_EVENTS_PG_NOTIFY enabled they are sent with pg_notify() inside the write
+transaction instead (so only committed changes are announced), and every
+worker's `TodoEventListener` relays them to its local subscribers.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.tasks import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "todo_events"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+# A write touching more todos than this is announced as a single "resync"
+MAX_EVENTS_PER_WRITE = 50
+# Events buffered per subscriber before it is told to resync instead
+SUBSCRIBER_QUEUE_SIZE = 100
+KEEPALIVE_SECONDS = 15
+RECONNECT_SECONDS = 5
+
+RESYNC = {"type": "resync"}
+
+
+class TodoEventHub:
+    """In-process pub/sub of todo events, keyed by user id."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        # Called with (user_id, events) for every publish; user_id is None for broadcasts
+        self._listeners: List[Callable[[Optional[str], List[dict]], None]] = []
+
+    def add_listener(self, callback: Callable[[Optional[str], List[dict]], None]) -> None:
+        """Register an in-process consumer of all users' events (e.g. the reminder scheduler)."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Optional[str], List[dict]], None]) -> None:
+        self._listeners.remove(callback)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id: str, events: List[dict]) -> None:
+        """Deliver events to this process's subscribers of `user_id`."""
+        if len(events) > MAX_EVENTS_PER_WRITE:
+            events = [RESYNC]
+        for listener in self._listeners:
+            listener(user_id, events)
+        for queue in self._subscribers.get(user_id, ()):
+            self._deliver(queue, events)
+
+    def publish_all(self, event: dict) -> None:
+        """Deliver one event to every local subscriber (e.g. resync after a lost connection)."""
+        for listener in self._listeners:
+            listener(None, [event])
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._deliver(queue, [event])
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, events: List[dict]) -> None:
+        for event in events:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled client: drop what it missed and have it resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                return
+
+    async def notify(self, session: AsyncSession, user_id: str, events: List[dict]) -> bool:
+        """
+        Queue events with pg_notify() in the session's transaction when the
+        Postgres fan-out is enabled. Returns False when the caller should
+        `publish` them itself after committing.
+        """
+        if not settings.TODO_EVENTS_PG_NOTIFY or session.bind.dialect.name != "postgresql":
+            return False
+        if len(events) > MAX_EVENTS_PER_WRITE:
+            events = [RESYNC]
+        payload = orjson.dumps({"userId": user_id, "events": events})
+        if len(payload) > MAX_NOTIFY_PAYLOAD:
+            # Subscribers fetch the todo themselves
+            events = [{key: value for key, value in event.items() if key != "todo"} for event in events]
+            payload = orjson.dumps({"userId": user_id, "events": events})
+        if len(payload) > MAX_NOTIFY_PAYLOAD:
+            payload = orjson.dumps({"userId": user_id, "events": [RESYNC]})
+        await session.execute(select(func.pg_notify(NOTIFY_CHANNEL, payload.decode())))
+        return True
+
+    async def sse(self, user_id: str) -> AsyncIterator[str]:
+        """Server-Sent Events stream of a user's todo events, with keepalive comments."""
+        async with self.subscribe(user_id) as queue:
+            yield f"retry: {RECONNECT_SECONDS * 1000}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {orjson.dumps(event).decode()}\n\n"
+
+
+todo_events = TodoEventHub()
+
+
+class TodoEventListener(BackgroundTask):
+    """
+    LISTENs on NOTIFY_CHANNEL over a dedicated connection and relays the
+    payloads to `todo_events`. Reconnects after losing the connection, telling
+    local subscribers to resync since notifications may have been missed.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            message = orjson.loads(payload)
+            todo_events.publish(message["userId"], message["events"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed %s notification", NOTIFY_CHANNEL)
+
+    async def _run(self) -> None:
+        first = True
+        while True:
+            try:
+                async with self.engine.connect() as connection:
+                    raw = (await connection.get_raw_connection()).driver_connection
+                    lost = asyncio.Event()
+                    on_lost = lambda _: lost.set()
+                    raw.add_termination_listener(on_lost)
+                    await raw.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                    try:
+                        if not first:
+                            todo_events.publish_all(RESYNC)
+                        first = False
+                        await lost.wait()
+                    finally:
+                        # The connection goes back to the pool; leave it as we found it
+                        raw.remove_termination_listener(on_lost)
+                        if not raw.is_closed():
+                            await raw.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Todo event listener failed; reconnecting")
+            await asyncio.sleep(RECONNECT_SECONDS)
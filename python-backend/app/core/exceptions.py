@@ -43,10 +43,10 @@ class ConflictException(HTTPException):
         super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail)
 
 
-async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    """Handle Pydantic validation errors with custom messages."""
+def format_validation_errors(raw_errors) -> list:
+    """Turn Pydantic error dicts into [{"field", "message"}] with our custom messages."""
     errors = []
-    for error in exc.errors():
+    for error in raw_errors:
         field = error["loc"][-1] if error["loc"] else "field"
         error_type = error["type"]
         
@@ -87,6 +87,12 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "field": field,
             "message": message
         })
+    return errors
+
+
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """Handle Pydantic validation errors with custom messages."""
+    errors = format_validation_errors(exc.errors())
     
     return JSONResponse(
         status_code=400,
@@ -0,0 +1,54 @@
+"""
+Conditional GET helpers (ETag / If-None-Match / 304).
+
+Representations are versioned per user by `users.dataVersion`, which every
+profile or todo write bumps in the same transaction. A matching ETag therefore
+proves nothing changed without reading the todos at all.
+"""
+import hashlib
+from fastapi import Request, Response
+from fastapi.staticfiles import StaticFiles
+
+# Per-user data: browsers may store it but must revalidate before every reuse
+CACHE_CONTROL = "private, no-cache"
+# Files whose URL changes with their content: cache for a year, never revalidate
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def compute_etag(*parts) -> str:
+    """Build a strong ETag from the user's data version and the request variant."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header matches `etag` (weak comparison, per RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (candidate.strip().removeprefix("W/") for candidate in header.split(","))
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    """Attach validator and caching headers to a 200 response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the same validator headers."""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag)
+    return response
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files that are never rewritten under the same name, served with IMMUTABLE_CACHE_CONTROL."""
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
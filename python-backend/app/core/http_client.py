@@ -0,0 +1,33 @@
+"""
+Outbound HTTP client shared for the lifetime of the app.
+
+One pooled `httpx.AsyncClient` keeps connections (and their TLS sessions) to
+Google and webhook targets alive between requests instead of handshaking on
+every call. HTTP/2 is used when the `h2` package is installed
+(`pip install httpx[http2]`). The lifespan closes the client on shutdown.
+"""
+import importlib.util
+from typing import Optional
+
+import httpx
+
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared client, created on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(http2=HTTP2, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
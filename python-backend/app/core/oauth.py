@@ -1,10 +1,28 @@
-from typing import Dict, Any
-import httpx
+import asyncio
+import logging
+import re
+import time
+from typing import Dict, Any, Optional
 from authlib.integrations.starlette_client import OAuth
+from jose import JWTError, jwt
 from starlette.config import Config
 from urllib.parse import urlencode
 from app.core.config import settings
 from app.core.exceptions import UnauthorizedException
+from app.core.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Freshness of fetched documents without a Cache-Control max-age
+DEFAULT_DOCUMENT_TTL = 3600.0
+# Stale documents are served (while refreshing in the background) for at most this long
+MAX_STALE_SECONDS = 86400.0
+# An unknown `kid` forces a JWKS refetch at most this often
+MIN_FORCED_REFRESH_SECONDS = 60.0
+# Google signs ID tokens with RS256; never let the token pick a symmetric algorithm
+ID_TOKEN_ALGORITHMS = ["RS256"]
+# Clock skew tolerated on id_token exp/iat
+ID_TOKEN_LEEWAY_SECONDS = 60
 
 # OAuth configuration
 config = Config('.env')
@@ -15,12 +33,60 @@ oauth.register(
     name='google',
     client_id=settings.GOOGLE_CLIENT_ID,
     client_secret=settings.GOOGLE_CLIENT_SECRET,
-    server_metadata_url='https://accounts.google.com/.well-known/openid_configuration',
+    server_metadata_url=settings.GOOGLE_DISCOVERY_URL,
     client_kwargs={
         'scope': 'openid email profile'
     }
 )
 
+class CachedDocument:
+    """
+    A JSON document (OIDC discovery, JWKS) fetched with the shared HTTP client
+    and kept for its Cache-Control max-age. Past that it is still served,
+    stale-while-revalidate, while a single background fetch replaces it; only
+    a missing or very stale (MAX_STALE_SECONDS) copy is fetched inline.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._value: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._background: Optional[asyncio.Task] = None
+
+    async def get(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        if self._value is None or now >= self._expires_at + MAX_STALE_SECONDS:
+            return await self.refresh()
+        if now >= self._expires_at and (self._background is None or self._background.done()):
+            self._background = asyncio.create_task(self._revalidate())
+        return self._value
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Fetch now; callers waiting on an in-flight fetch share its result."""
+        fetched_at = self._fetched_at
+        async with self._lock:
+            if self._value is None or self._fetched_at == fetched_at:
+                await self._fetch()
+            return self._value
+
+    async def _revalidate(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            # Keep serving the stale copy; the next get() tries again
+            logger.warning("Refreshing %s failed", self.url, exc_info=True)
+
+    async def _fetch(self) -> None:
+        response = await get_http_client().get(self.url)
+        response.raise_for_status()
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        self._value = response.json()
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + (int(match.group(1)) if match else DEFAULT_DOCUMENT_TTL)
+
+
 class GoogleOAuth:
     """Google OAuth2 client."""
     
@@ -31,6 +97,10 @@ class GoogleOAuth:
         
         if not all([self.client_id, self.client_secret, self.redirect_uri]):
             raise ValueError("Google OAuth credentials not configured")
+        
+        self.discovery = CachedDocument(settings.GOOGLE_DISCOVERY_URL)
+        self._jwks: Optional[CachedDocument] = None
+        self._jwks_forced_at = float("-inf")
     
     def get_authorization_url(self, state: str = None) -> str:
         """Get Google OAuth authorization URL."""
@@ -50,7 +120,7 @@ class GoogleOAuth:
     
     async def exchange_code_for_tokens(self, code: str) -> Dict[str, Any]:
         """Exchange authorization code for access and refresh tokens."""
-        token_url = "https://oauth2.googleapis.com/token"
+        metadata = await self.discovery.get()
         data = {
             "client_id": self.client_id,
             "client_secret": self.client_secret,
@@ -59,33 +129,65 @@ class GoogleOAuth:
             "redirect_uri": self.redirect_uri
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data)
-            if response.status_code != 200:
-                raise UnauthorizedException("Failed to exchange code for tokens")
-            
-            return response.json()
+        response = await get_http_client().post(metadata["token_endpoint"], data=data)
+        if response.status_code != 200:
+            raise UnauthorizedException("Failed to exchange code for tokens")
+        
+        return response.json()
     
     async def get_user_info(self, access_token: str) -> Dict[str, Any]:
-        """Get user information from Google."""
-        userinfo_url = "https://www.googleapis.com/oauth2/v2/userinfo"
+        """Get user information from Google's userinfo endpoint."""
+        metadata = await self.discovery.get()
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(userinfo_url, headers=headers)
-            if response.status_code != 200:
-                raise UnauthorizedException("Failed to get user info from Google")
-            
-            return response.json()
+        response = await get_http_client().get(metadata["userinfo_endpoint"], headers=headers)
+        if response.status_code != 200:
+            raise UnauthorizedException("Failed to get user info from Google")
+        
+        return response.json()
     
-    async def verify_id_token(self, id_token: str) -> Dict[str, Any]:
-        """Verify Google ID token."""
+    async def verify_id_token(self, id_token: str, access_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Verify a Google ID token locally against the cached JWKS: signature,
+        issuer, audience (our client id), expiry and, given the access token
+        it came with, at_hash. Returns its claims.
+        """
+        metadata = await self.discovery.get()
+        if self._jwks is None or self._jwks.url != metadata["jwks_uri"]:
+            self._jwks = CachedDocument(metadata["jwks_uri"])
         try:
-            import jwt
-            decoded = jwt.decode(id_token, options={"verify_signature": False})
-            return decoded
-        except Exception:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+            jwks = await self._jwks.get()
+            known = {key.get("kid") for key in jwks.get("keys", [])}
+            if kid not in known and time.monotonic() - self._jwks_forced_at >= MIN_FORCED_REFRESH_SECONDS:
+                # Google rotated its keys since the cached copy was fetched
+                self._jwks_forced_at = time.monotonic()
+                jwks = await self._jwks.refresh()
+            issuer = metadata["issuer"]
+            return jwt.decode(
+                id_token,
+                jwks,
+                algorithms=ID_TOKEN_ALGORITHMS,
+                audience=self.client_id,
+                # Google issues both forms
+                issuer=[issuer, issuer.removeprefix("https://")],
+                access_token=access_token,
+                options={"leeway": ID_TOKEN_LEEWAY_SECONDS},
+            )
+        except JWTError:
             raise UnauthorizedException("Invalid ID token")
+    
+    async def get_login_claims(self, token_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The signed-in user's email, name and picture. Taken from the verified
+        id_token when it has them, which saves the userinfo round trip.
+        """
+        access_token = token_data["access_token"]
+        if token_data.get("id_token"):
+            claims = await self.verify_id_token(token_data["id_token"], access_token)
+            if claims.get("email"):
+                return claims
+        return await self.get_user_info(access_token)
 
 # Global OAuth instance - only create if credentials are configured
 try:
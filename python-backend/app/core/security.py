@@ -1,21 +1,74 @@
+import hashlib
 import secrets
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from app.utils.helpers import parse_timedelta
-from typing import Optional
+from typing import AsyncIterator, Optional, Tuple
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import AsyncSessionLocal, mark_write, read_session
 from app.db.models.user import User
 from app.api.users.repository import UsersRepository
+from app.core.user_cache import user_cache
 
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Requests served from a read replica
+READ_METHODS = ("GET", "HEAD")
+
+
+class TokenCache:
+    """
+    Payloads of successfully verified tokens, keyed by token type and a hash of
+    the token, until the token's `exp`; the least recently used go first once
+    JWT_CACHE_SIZE is reached. Only valid tokens are cached.
+    """
+
+    def __init__(self, enabled: bool, maxsize: int):
+        self.enabled = enabled
+        self.maxsize = maxsize
+        # (type, sha256 of token) -> (exp, payload); oldest use first
+        self._entries: "OrderedDict[Tuple[str, bytes], Tuple[float, dict]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str, token_type: str) -> Tuple[str, bytes]:
+        return token_type, hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str, token_type: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        key = self._key(token, token_type)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(entry[1])
+
+    def put(self, token: str, token_type: str, payload: dict) -> None:
+        # Without exp a token never expires; keep verifying those each time
+        if not self.enabled or not isinstance(payload.get("exp"), (int, float)):
+            return
+        self._entries[self._key(token, token_type)] = (payload["exp"], dict(payload))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Global decoded-token cache
+token_cache = TokenCache(settings.JWT_CACHE_ENABLED, settings.JWT_CACHE_SIZE)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -38,12 +91,16 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
-    """Verify and decode a JWT token."""
+    """Verify and decode a JWT token (served from `token_cache` for tokens seen before)."""
+    payload = token_cache.get(token, token_type)
+    if payload is not None:
+        return payload
     try:
         secret = settings.ACCESS_TOKEN_SECRET if token_type == "access" else settings.REFRESH_TOKEN_SECRET
         payload = jwt.decode(token, secret, algorithms=[settings.ALGORITHM])
         if payload.get("type") != token_type:
             return None
+        token_cache.put(token, token_type, payload)
         return payload
     except JWTError:
         return None
@@ -52,31 +109,82 @@ def generate_random_string(length: int = 32) -> str:
     """Generate a random string for IDs."""
     return secrets.token_urlsafe(length)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Get current user from JWT token."""
+async def get_token_user_id(token: str = Depends(oauth2_scheme)) -> str:
+    """Get the user id (`sub`) of a valid access token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = verify_token(token, "access")
-        if payload is None:
-            raise credentials_exception
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    payload = verify_token(token, "access")
+    if payload is None or payload.get("sub") is None:
         raise credentials_exception
+    return payload["sub"]
+
+async def get_user_db(request: Request, user_id: str = Depends(get_token_user_id)) -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get the database session of an authenticated request:
+    a read replica for GET/HEAD, the primary for writes. A write pins the
+    user's reads to the primary for a few seconds (read-your-writes).
+    """
+    if request.method in READ_METHODS:
+        async with read_session(user_id) as session:
+            yield session
+        return
+    
+    mark_write(user_id)
+    async with AsyncSessionLocal() as session:
+        yield session
+    # Restart the window from the end of the write
+    mark_write(user_id)
+
+async def get_current_user(
+    user_id: str = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_user_db)
+) -> User:
+    """
+    Get current user from JWT token.
+    Served from the user cache when possible; a cached user is not attached to
+    `db` (see UsersRepository.get_data_version).
+    """
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
     
     repo = UsersRepository(db)
     user = await repo.get_by_id(user_id)
     
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user_cache.put(user)
+    return user
+
+async def get_streaming_user(user_id: str = Depends(get_token_user_id)) -> User:
+    """
+    `get_current_user` for streaming responses. Dependencies with `yield` are
+    only torn down once the response has been sent, so a request-scoped session
+    would hold its connection for the whole stream; this one is closed before
+    the route runs.
+    """
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    
+    async with read_session(user_id) as session:
+        user = await UsersRepository(session).get_by_id(user_id)
+    
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    return user
\ No newline at end of file
+    user_cache.put(user)
+    return user
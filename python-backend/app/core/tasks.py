@@ -0,0 +1,48 @@
+"""
+Base classes for the background tasks started from the app lifespan.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTask:
+    """An asyncio task with start()/stop(); subclasses implement `_run`."""
+
+    _task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        raise NotImplementedError
+
+
+class PeriodicTask(BackgroundTask):
+    """Runs `tick` at startup and then whenever `_seconds_until_next_run` says; failures are logged."""
+
+    async def tick(self) -> None:
+        raise NotImplementedError
+
+    def _seconds_until_next_run(self) -> float:
+        raise NotImplementedError
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("%s failed", type(self).__name__)
+            await asyncio.sleep(max(self._seconds_until_next_run(), 0))
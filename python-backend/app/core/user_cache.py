@@ -0,0 +1,79 @@
+"""
+In-process cache of authenticated users, so `get_current_user` does not load
+the user row on every request.
+
+Entries are column snapshots keyed by user id, bounded in size (least
+recently used first out) and age (USER_CACHE_TTL_SECONDS). Every hit builds a
+fresh, session-less User, so requests never share an ORM instance. Profile
+updates, logins, token refreshes and logouts invalidate the user's entry in
+the worker that handles them; other workers catch up within the TTL.
+
+Cached users carry a possibly stale `dataVersion`: ETags must use
+`UsersRepository.get_data_version`, which only queries for cached users.
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.db.models.user import User
+
+USER_COLUMNS = tuple(column.key for column in User.__table__.c)
+
+
+class UserCache:
+    """Bounded TTL/LRU map of user id -> column values, with hit/miss counters."""
+
+    def __init__(self, enabled: bool, maxsize: int, ttl: float):
+        self.enabled = enabled
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # user id -> (monotonic expiry, column values); oldest use first
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[User]:
+        """A detached copy of the cached user, or None (always None when disabled)."""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return User(**entry[1])
+
+    def put(self, user: User) -> None:
+        """Cache a freshly loaded user."""
+        if not self.enabled:
+            return
+        values = {key: getattr(user, key) for key in USER_COLUMNS}
+        self._entries[user.id] = (time.monotonic() + self.ttl, values)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop the user's entry after a write to their row."""
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters since startup."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+
+# Global user cache
+user_cache = UserCache(settings.USER_CACHE_ENABLED, settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
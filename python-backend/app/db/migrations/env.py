@@ -9,6 +9,12 @@ from alembic import context
 from app.db.base import Base
 from app.db.models.user import User
 from app.db.models.todo import Todo
+from app.db.models.todo_counter import TodoCounter
+from app.db.models.todo_tombstone import TodoTombstone
+from app.db.models.notification import Notification
+from app.db.models.todo_archive import TodoArchive
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.avatar_file import AvatarFile
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,42 @@
+"""Add todo_tombstones and the todos updatedAt index for delta sync
+
+Revision ID: 369a091c9fbe
+Revises: 57e93f3d4457
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '369a091c9fbe'
+down_revision = '57e93f3d4457'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'todo_tombstones',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('userId', sa.String(length=36), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('deletedAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_todo_tombstones_user_deleted', 'todo_tombstones', ['userId', 'deletedAt'], unique=False)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todos_user_updated',
+            'todos',
+            ['userId', 'updatedAt', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todos_user_updated', table_name='todos', postgresql_concurrently=True)
+    op.drop_index('ix_todo_tombstones_user_deleted', table_name='todo_tombstones')
+    op.drop_table('todo_tombstones')
@@ -0,0 +1,24 @@
+"""Add users.dataVersion for ETag-based conditional GETs
+
+Revision ID: 55a4cb9615e9
+Revises: d5148de1f51a
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '55a4cb9615e9'
+down_revision = 'd5148de1f51a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('dataVersion', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('dataVersion')
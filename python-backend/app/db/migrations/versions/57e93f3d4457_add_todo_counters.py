@@ -0,0 +1,42 @@
+"""Add todo_counters for the /todos/stats endpoint
+
+Revision ID: 57e93f3d4457
+Revises: 55a4cb9615e9
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '57e93f3d4457'
+down_revision = '55a4cb9615e9'
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+INSERT INTO todo_counters ("userId", dimension, value, count)
+SELECT "userId", 'total', '', COUNT(*) FROM todos GROUP BY "userId"
+UNION ALL
+SELECT "userId", 'completed', '', COUNT(*) FROM todos WHERE completed = true GROUP BY "userId"
+UNION ALL
+SELECT "userId", 'priority', priority, COUNT(*) FROM todos GROUP BY "userId", priority
+UNION ALL
+SELECT "userId", 'category', category, COUNT(*) FROM todos GROUP BY "userId", category
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'todo_counters',
+        sa.Column('userId', sa.String(length=36), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('dimension', sa.String(length=20), nullable=False),
+        sa.Column('value', sa.String(length=20), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('userId', 'dimension', 'value'),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_table('todo_counters')
@@ -0,0 +1,69 @@
+"""Move refresh tokens from users.refreshToken to a hashed, multi-session refresh_tokens table
+
+Revision ID: 678a2543b5ac
+Revises: a9f5a664bc40
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+from jose import JWTError, jwt
+
+# revision identifiers, used by Alembic.
+revision = '678a2543b5ac'
+down_revision = 'a9f5a664bc40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    refresh_tokens = op.create_table(
+        'refresh_tokens',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('userId', sa.String(length=36), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('tokenHash', sa.String(length=64), nullable=False),
+        sa.Column('expiresAt', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revokedAt', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_refresh_tokens_tokenHash', 'refresh_tokens', ['tokenHash'], unique=True)
+    op.create_index('ix_refresh_tokens_user_expires', 'refresh_tokens', ['userId', 'expiresAt'], unique=False)
+    op.create_index('ix_refresh_tokens_expires', 'refresh_tokens', ['expiresAt'], unique=False)
+
+    # Carry over the current session of each user; its expiry is read from the token itself
+    users = op.get_bind().execute(
+        sa.text('SELECT id, "refreshToken" FROM users WHERE "refreshToken" IS NOT NULL')
+    ).all()
+    rows = []
+    for user_id, token in users:
+        try:
+            expires = jwt.get_unverified_claims(token).get('exp')
+        except JWTError:
+            continue
+        if not isinstance(expires, (int, float)):
+            continue
+        rows.append({
+            'id': str(uuid.uuid4()),
+            'userId': user_id,
+            'tokenHash': hashlib.sha256(token.encode()).hexdigest(),
+            'expiresAt': datetime.fromtimestamp(expires, timezone.utc),
+        })
+    if rows:
+        op.bulk_insert(refresh_tokens, rows)
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('refreshToken')
+
+
+def downgrade() -> None:
+    # Only hashes are stored, so every user has to log in again
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('refreshToken', sa.Text(), nullable=True))
+    op.drop_index('ix_refresh_tokens_expires', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_user_expires', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_tokenHash', table_name='refresh_tokens')
+    op.drop_table('refresh_tokens')
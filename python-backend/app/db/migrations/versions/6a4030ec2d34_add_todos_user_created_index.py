@@ -0,0 +1,23 @@
+"""Add (userId, createdAt, id) index on todos for keyset pagination
+
+Revision ID: 6a4030ec2d34
+Revises: b5c9a1e2d3f4
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '6a4030ec2d34'
+down_revision = 'b5c9a1e2d3f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_todos_user_created', 'todos', ['userId', 'createdAt', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_user_created', table_name='todos')
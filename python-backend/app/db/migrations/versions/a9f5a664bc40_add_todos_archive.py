@@ -0,0 +1,61 @@
+"""Add todos_archive for completed todos moved out of the hot table
+
+Revision ID: a9f5a664bc40
+Revises: e84da535bd8f
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a9f5a664bc40'
+down_revision = 'e84da535bd8f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'todos_archive',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=False),
+        sa.Column('priority', sa.String(length=20), nullable=False),
+        sa.Column('category', sa.String(length=20), nullable=False),
+        sa.Column('dueDate', sa.DateTime(timezone=False), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('userId', sa.String(length=36), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('createdAt', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updatedAt', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('remindedAt', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archivedAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_todos_archive_user_created', 'todos_archive', ['userId', 'createdAt', 'id'], unique=False)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todos_completed_updated',
+            'todos',
+            ['updatedAt'],
+            unique=False,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'completed'"),
+            sqlite_where=sa.text("status = 'completed'"),
+        )
+
+
+def downgrade() -> None:
+    # Move archived todos back so downgrading loses nothing
+    op.execute(
+        'INSERT INTO todos (id, title, description, completed, priority, category, "dueDate", status, '
+        '"userId", "createdAt", "updatedAt", "remindedAt") '
+        'SELECT id, title, description, completed, priority, category, "dueDate", status, '
+        '"userId", "createdAt", "updatedAt", "remindedAt" FROM todos_archive'
+    )
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todos_completed_updated', table_name='todos', postgresql_concurrently=True)
+    op.drop_index('ix_todos_archive_user_created', table_name='todos_archive')
+    op.drop_table('todos_archive')
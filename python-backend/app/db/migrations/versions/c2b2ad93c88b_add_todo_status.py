@@ -0,0 +1,72 @@
+"""Add materialized todos.status for the status filters
+
+Revision ID: c2b2ad93c88b
+Revises: 369a091c9fbe
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c2b2ad93c88b'
+down_revision = '369a091c9fbe'
+branch_labels = None
+depends_on = None
+
+# Indexes of faea84749b6a that the status column replaces
+STATUS_PREDICATE_INDEXES = [
+    ('ix_todos_completed_created', ['userId', 'createdAt', 'id'], 'completed = true'),
+    ('ix_todos_open_created', ['userId', 'createdAt', 'id'], 'completed = false'),
+    ('ix_todos_open_due', ['userId', 'dueDate'], 'completed = false'),
+]
+
+
+def upgrade() -> None:
+    op.add_column('todos', sa.Column('status', sa.String(length=20), server_default='pending', nullable=False))
+    today = "date('now', 'localtime')" if op.get_context().dialect.name == 'sqlite' else 'CURRENT_DATE'
+    op.execute(
+        "UPDATE todos SET status = CASE "
+        "WHEN completed THEN 'completed' "
+        f"WHEN \"dueDate\" < {today} THEN 'overdue' "
+        "ELSE 'pending' END"
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block on Postgres
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todos_user_status_created',
+            'todos',
+            ['userId', 'status', 'createdAt', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_todos_pending_due',
+            'todos',
+            ['dueDate'],
+            unique=False,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'pending'"),
+            sqlite_where=sa.text("status = 'pending'"),
+        )
+        for name, _, _ in STATUS_PREDICATE_INDEXES:
+            op.drop_index(name, table_name='todos', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns, where in STATUS_PREDICATE_INDEXES:
+            predicate = sa.text(where)
+            op.create_index(
+                name,
+                'todos',
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=predicate,
+                sqlite_where=predicate,
+            )
+        op.drop_index('ix_todos_pending_due', table_name='todos', postgresql_concurrently=True)
+        op.drop_index('ix_todos_user_status_created', table_name='todos', postgresql_concurrently=True)
+    with op.batch_alter_table('todos') as batch_op:
+        batch_op.drop_column('status')
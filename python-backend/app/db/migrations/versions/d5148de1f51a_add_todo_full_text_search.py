@@ -0,0 +1,45 @@
+"""Add full-text search to todos (tsvector + GIN on Postgres, FTS5 on SQLite)
+
+Revision ID: d5148de1f51a
+Revises: faea84749b6a
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# Shared with metadata.create_all(), so dev and migrated databases get the same DDL
+from app.db.search import PG_SEARCH_COLUMN_DDL, SQLITE_DDL, SQLITE_REBUILD, pg_search_index_ddl
+
+# revision identifiers, used by Alembic.
+revision = 'd5148de1f51a'
+down_revision = 'faea84749b6a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Generated column: Postgres recomputes it on every INSERT/UPDATE of title/description
+        op.execute(PG_SEARCH_COLUMN_DDL)
+        with op.get_context().autocommit_block():
+            op.execute(pg_search_index_ddl(concurrently=True))
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        # Index the rows that already exist
+        op.execute(SQLITE_REBUILD)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_todos_search_vector')
+        op.drop_column('todos', 'searchVector')
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS todos_fts_ai')
+        op.execute('DROP TABLE IF EXISTS todos_fts')
@@ -0,0 +1,32 @@
+"""Add avatar_files for content-addressed, reference-counted avatars
+
+Revision ID: d57437b98a6e
+Revises: 678a2543b5ac
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd57437b98a6e'
+down_revision = '678a2543b5ac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Avatars uploaded before this revision keep their per-user files and are not counted
+    op.create_table(
+        'avatar_files',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('extension', sa.String(length=10), nullable=False),
+        sa.Column('refCount', sa.Integer(), nullable=False),
+        sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updatedAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('hash'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('avatar_files')
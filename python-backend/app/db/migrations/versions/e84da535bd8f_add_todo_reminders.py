@@ -0,0 +1,42 @@
+"""Add todos.remindedAt and notifications for due-date reminders
+
+Revision ID: e84da535bd8f
+Revises: c2b2ad93c88b
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e84da535bd8f'
+down_revision = 'c2b2ad93c88b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('todos', sa.Column('remindedAt', sa.DateTime(timezone=True), nullable=True))
+    # Todos already past their due time count as reminded, so deploying does not send a backlog
+    # dueDate is a naive local time
+    local_now = "datetime('now', 'localtime')" if op.get_context().dialect.name == 'sqlite' else 'LOCALTIMESTAMP'
+    op.execute(f'UPDATE todos SET "remindedAt" = CURRENT_TIMESTAMP WHERE "dueDate" < {local_now}')
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('userId', sa.String(length=36), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('todoId', sa.String(length=36), nullable=True),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('createdAt', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('readAt', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_notifications_user_created', 'notifications', ['userId', 'createdAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_user_created', table_name='notifications')
+    op.drop_table('notifications')
+    with op.batch_alter_table('todos') as batch_op:
+        batch_op.drop_column('remindedAt')
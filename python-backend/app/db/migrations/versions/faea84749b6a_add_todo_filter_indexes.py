@@ -0,0 +1,50 @@
+"""Add composite and partial indexes for the todo filter matrix
+
+Revision ID: faea84749b6a
+Revises: 6a4030ec2d34
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'faea84749b6a'
+down_revision = '6a4030ec2d34'
+branch_labels = None
+depends_on = None
+
+# (name, columns, partial index predicate)
+INDEXES = [
+    ('ix_todos_user_priority_created', ['userId', 'priority', 'createdAt', 'id'], None),
+    ('ix_todos_user_category_created', ['userId', 'category', 'createdAt', 'id'], None),
+    ('ix_todos_user_priority_category_created', ['userId', 'priority', 'category', 'createdAt', 'id'], None),
+    ('ix_todos_completed_created', ['userId', 'createdAt', 'id'], 'completed = true'),
+    ('ix_todos_open_created', ['userId', 'createdAt', 'id'], 'completed = false'),
+    ('ix_todos_open_due', ['userId', 'dueDate'], 'completed = false'),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block on Postgres
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            predicate = sa.text(where) if where else None
+            op.create_index(
+                name,
+                'todos',
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                postgresql_where=predicate,
+                sqlite_where=predicate,
+            )
+        # Every composite above starts with userId, so the single-column index is redundant
+        op.drop_index('ix_todos_userId', table_name='todos', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_todos_userId', 'todos', ['userId'], unique=False, postgresql_concurrently=True)
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='todos', postgresql_concurrently=True)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.db.models.todo import Timestamp
+
+class AvatarFile(Base):
+    """
+    One stored avatar image, named `<hash><extension>` in UPLOAD_DIR after the
+    SHA-256 of its content. `refCount` is the number of users whose avatar it
+    is; a file nobody references any more stays on disk until collected.
+    """
+    
+    __tablename__ = "avatar_files"
+    
+    hash: str = Column(String(64), primary_key=True)  # hex SHA-256
+    extension: str = Column(String(10), nullable=False)  # e.g. ".png"
+    refCount: int = Column(Integer, nullable=False, default=0)
+    createdAt: datetime = Column(Timestamp, server_default=func.now(), nullable=False)
+    # Last reference change
+    updatedAt: datetime = Column(Timestamp, server_default=func.now(), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<AvatarFile(hash={self.hash}, refCount={self.refCount})>"
@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy import Column, ForeignKey, Index, String, Text
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.db.models.todo import Timestamp
+
+class Notification(Base):
+    """In-app notification (e.g. a todo due-date reminder)."""
+    
+    __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_created", "userId", "createdAt"),
+    )
+    
+    id: str = Column(String(36), primary_key=True)
+    userId: str = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Todo the notification is about; no FK so it outlives the todo
+    todoId: str = Column(String(36), nullable=True)
+    kind: str = Column(String(20), nullable=False)  # e.g. "todo_due"
+    message: str = Column(Text, nullable=False)
+    createdAt: datetime = Column(Timestamp, server_default=func.now(), nullable=False)
+    readAt: datetime = Column(Timestamp, nullable=True)
+    
+    def __repr__(self) -> str:
+        return f"<Notification(id={self.id}, userId={self.userId}, kind={self.kind})>"
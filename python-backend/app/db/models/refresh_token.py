@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, ForeignKey, Index, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.db.models.todo import Timestamp
+
+class RefreshToken(Base):
+    """
+    One login session: the SHA-256 of its refresh token, never the token itself.
+    A user has one row per device; revoked and expired rows are purged in batches.
+    """
+    
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_user_expires", "userId", "expiresAt"),
+        Index("ix_refresh_tokens_expires", "expiresAt"),
+    )
+    
+    id: str = Column(String(36), primary_key=True)
+    userId: str = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    tokenHash: str = Column(String(64), nullable=False, unique=True, index=True)  # hex SHA-256
+    expiresAt: datetime = Column(Timestamp, nullable=False)
+    revokedAt: datetime = Column(Timestamp, nullable=True)
+    createdAt: datetime = Column(Timestamp, server_default=func.now(), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<RefreshToken(id={self.id}, userId={self.userId}, expiresAt={self.expiresAt})>"
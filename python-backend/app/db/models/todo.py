@@ -1,9 +1,17 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, Text, UniqueConstraint
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
 
+# SQLite's CURRENT_TIMESTAMP has no fractional seconds; bind parameters must be
+# rendered the same way or keyset comparisons on the column skip/repeat rows.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 class Todo(Base):
     """Todo model."""
     
@@ -16,13 +24,17 @@ class Todo(Base):
     priority: str = Column(String(20), nullable=False)  # enum: high, medium, low
     category: str = Column(String(20), nullable=False)  # enum: work, personal, health, finance, education, other
     dueDate: DateTime = Column(DateTime(timezone=False), nullable=True)  # Optional; stored as naive datetime
+    # pending/overdue/completed, derived from completed + dueDate on write; the
+    # overdue sweeper flips pending -> overdue once the due day has passed
+    status: str = Column(String(20), nullable=False, default="pending", server_default="pending")
     
     # Foreign Keys
-    userId: str = Column(String(36), ForeignKey("users.id"), nullable=False, index=True)  # camelCase field
+    userId: str = Column(String(36), ForeignKey("users.id"), nullable=False)  # camelCase field; indexed via the composites below
     
     # Timestamps
-    createdAt: datetime = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # camelCase
-    updatedAt: datetime = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)  # camelCase
+    createdAt: datetime = Column(Timestamp, server_default=func.now(), nullable=False)  # camelCase
+    updatedAt: datetime = Column(Timestamp, server_default=func.now(), onupdate=func.now(), nullable=False)  # camelCase
+    remindedAt: datetime = Column(Timestamp, nullable=True)  # due-date reminder sent; cleared when dueDate changes
     
     # Relationships
     user = relationship("User", back_populates="todos")
@@ -30,6 +42,22 @@ class Todo(Base):
     # Composite unique constraint
     __table_args__ = (
         UniqueConstraint('title', 'userId', name='unique_title_per_user'),
+        # Serves the default list order and keyset pagination on (createdAt, id)
+        Index('ix_todos_user_created', 'userId', 'createdAt', 'id'),
+        # One index per equality filter of find_all, each ending in the sort key
+        Index('ix_todos_user_priority_created', 'userId', 'priority', 'createdAt', 'id'),
+        Index('ix_todos_user_category_created', 'userId', 'category', 'createdAt', 'id'),
+        Index('ix_todos_user_priority_category_created', 'userId', 'priority', 'category', 'createdAt', 'id'),
+        # Status filters (equality on the materialized status column)
+        Index('ix_todos_user_status_created', 'userId', 'status', 'createdAt', 'id'),
+        # Overdue sweeper: pending todos by due date, across users
+        Index('ix_todos_pending_due', 'dueDate',
+              postgresql_where=status == 'pending', sqlite_where=status == 'pending'),
+        # Archiver: completed todos by last change, across users
+        Index('ix_todos_completed_updated', 'updatedAt',
+              postgresql_where=status == 'completed', sqlite_where=status == 'completed'),
+        # Delta sync: todos changed since a sync token
+        Index('ix_todos_user_updated', 'userId', 'updatedAt', 'id'),
     )
     
     def __repr__(self) -> str:
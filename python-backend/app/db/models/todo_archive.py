@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, Text
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.db.models.todo import Timestamp
+
+class TodoArchive(Base):
+    """
+    Cold storage for completed todos past TODO_ARCHIVE_AFTER_DAYS.
+    Same columns as Todo plus archivedAt; only read for
+    status=completed&includeArchived=true, exports, full syncs and
+    single-todo lookups. Updating a todo moves it back to `todos`.
+    """
+    
+    __tablename__ = "todos_archive"
+    __table_args__ = (
+        Index("ix_todos_archive_user_created", "userId", "createdAt", "id"),
+    )
+    
+    id: str = Column(String(36), primary_key=True)
+    title: str = Column(String(255), nullable=False)
+    description: str = Column(Text, nullable=False, default="")
+    completed: bool = Column(Boolean, default=True, nullable=False)
+    priority: str = Column(String(20), nullable=False)
+    category: str = Column(String(20), nullable=False)
+    dueDate: DateTime = Column(DateTime(timezone=False), nullable=True)
+    status: str = Column(String(20), nullable=False, default="completed")
+    userId: str = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    createdAt: datetime = Column(Timestamp, nullable=False)
+    updatedAt: datetime = Column(Timestamp, nullable=False)
+    remindedAt: datetime = Column(Timestamp, nullable=True)
+    archivedAt: datetime = Column(Timestamp, server_default=func.now(), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<TodoArchive(id={self.id}, title={self.title}, userId={self.userId})>"
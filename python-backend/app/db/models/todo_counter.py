@@ -0,0 +1,17 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+from app.db.base import Base
+
+class TodoCounter(Base):
+    """Per-user todo counters, maintained by TodoService in the same transaction as each write."""
+    
+    __tablename__ = "todo_counters"
+    
+    userId: str = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # "total", "completed", "priority" or "category"
+    dimension: str = Column(String(20), primary_key=True)
+    # Priority/category value; empty for "total" and "completed"
+    value: str = Column(String(20), primary_key=True, default="")
+    count: int = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self) -> str:
+        return f"<TodoCounter(userId={self.userId}, dimension={self.dimension}, value={self.value}, count={self.count})>"
@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, ForeignKey, Index, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.db.models.todo import Timestamp
+
+class TodoTombstone(Base):
+    """Record of a deleted todo, kept so delta sync can tell clients to drop it."""
+    
+    __tablename__ = "todo_tombstones"
+    __table_args__ = (
+        Index("ix_todo_tombstones_user_deleted", "userId", "deletedAt"),
+    )
+    
+    id: str = Column(String(36), primary_key=True)  # id of the deleted todo
+    userId: str = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    deletedAt: datetime = Column(Timestamp, server_default=func.now(), nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<TodoTombstone(id={self.id}, userId={self.userId}, deletedAt={self.deletedAt})>"
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -14,7 +14,8 @@ class User(Base):
     name: str = Column(String(255), nullable=False)
     avatar: str = Column(Text, nullable=True)
     bio: str = Column(Text, nullable=True)
-    refreshToken: str = Column(Text, nullable=True)  # camelCase field
+    # Bumped by every write to the profile or the user's todos; drives ETags
+    dataVersion: int = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Timestamps (camelCase)
     createdAt: datetime = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,98 @@
+"""
+Full-text search over todo titles and descriptions.
+
+Postgres keeps a generated `searchVector` tsvector column on `todos` (GIN indexed);
+SQLite keeps an external-content FTS5 table `todos_fts` maintained by triggers.
+Both are updated by the database itself, so every write path stays in sync.
+Other dialects fall back to a substring match without ranking.
+"""
+from typing import Optional, Tuple
+from sqlalchemy import DDL, Float, event, func, literal_column, or_, select, table, column
+from sqlalchemy.sql import Select, ColumnElement
+from app.db.models.todo import Todo
+
+# Text search configuration used by the Postgres generated column and queries
+PG_TS_CONFIG = "english"
+
+# The statements below are run both by migration d5148de1f51a and, for dev databases,
+# by metadata.create_all(); changing them needs a new migration too
+PG_SEARCH_COLUMN_DDL = f"""ALTER TABLE todos ADD COLUMN "searchVector" tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('{PG_TS_CONFIG}', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('{PG_TS_CONFIG}', coalesce(description, '')), 'B')
+) STORED"""
+
+
+def pg_search_index_ddl(concurrently: bool = False) -> str:
+    """GIN index on the search column; CONCURRENTLY (outside a transaction) on live tables."""
+    return f'CREATE INDEX {"CONCURRENTLY " if concurrently else ""}ix_todos_search_vector ON todos USING gin ("searchVector")'
+
+
+PG_DDL = [PG_SEARCH_COLUMN_DDL, pg_search_index_ddl()]
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE todos_fts USING fts5(
+        title, description, content='todos', content_rowid='rowid', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER todos_fts_ai AFTER INSERT ON todos BEGIN
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+    END""",
+    """CREATE TRIGGER todos_fts_ad AFTER DELETE ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+    END""",
+    """CREATE TRIGGER todos_fts_au AFTER UPDATE OF title, description ON todos BEGIN
+        INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+        INSERT INTO todos_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+    END""",
+]
+
+# Rebuilds the SQLite index from `todos` (e.g. after a VACUUM renumbered rowids)
+SQLITE_REBUILD = "INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')"
+
+# Keep metadata.create_all() (dev databases) on par with the migrations
+for _statement in PG_DDL:
+    event.listen(Todo.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_DDL:
+    event.listen(Todo.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+_todos_fts = table("todos_fts", column("rowid"))
+
+
+def _fts5_query(term: str) -> str:
+    """Quote each word so user input cannot inject FTS5 syntax; the last word matches as a prefix."""
+    tokens = ['"' + token.replace('"', '""') + '"' for token in term.split()]
+    if tokens:
+        tokens[-1] += "*"
+    return " ".join(tokens)
+
+
+def apply_todo_search(query: Select, dialect_name: str, term: str) -> Tuple[Select, Optional[ColumnElement]]:
+    """
+    Restrict a `select(Todo)` query to todos matching `term`.
+    Returns the new query and a relevance expression (higher is better),
+    or None when the dialect has no full-text engine.
+    """
+    if dialect_name == "postgresql":
+        search_vector = literal_column('todos."searchVector"')
+        ts_query = func.websearch_to_tsquery(PG_TS_CONFIG, term)
+        rank = func.ts_rank_cd(search_vector, ts_query, type_=Float)
+        return query.where(search_vector.op("@@")(ts_query)), rank
+
+    if dialect_name == "sqlite":
+        tokens = _fts5_query(term)
+        if not tokens:
+            return query, None
+        # bm25() is only valid next to MATCH, so rank inside a derived table;
+        # title hits weigh more than description hits, as on Postgres
+        matches = (
+            select(
+                _todos_fts.c.rowid.label("rowid"),
+                (-func.bm25(literal_column("todos_fts"), 10.0, 1.0, type_=Float)).label("score"),
+            )
+            .where(literal_column("todos_fts").op("MATCH")(tokens))
+            .subquery("search_matches")
+        )
+        query = query.join(matches, matches.c.rowid == literal_column("todos.rowid"))
+        return query, matches.c.score
+
+    like = f"%{term}%"
+    return query.where(or_(Todo.title.ilike(like), Todo.description.ilike(like))), None
@@ -1,9 +1,27 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# A replica that failed to connect is skipped for this long
+REPLICA_RETRY_SECONDS = 30.0
+
 # Create async engine
 engine = create_async_engine(settings.DATABASE_URL, echo=False, pool_pre_ping=True)
 
+# Read replicas (DATABASE_READ_URL, comma-separated); empty means every read goes to the primary
+read_engines: List[AsyncEngine] = [
+    create_async_engine(url.strip(), echo=False, pool_pre_ping=True)
+    for url in (settings.DATABASE_READ_URL or "").split(",")
+    if url.strip()
+]
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -13,10 +31,60 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# engine -> monotonic time until which it is considered down
+_replica_down_until: Dict[AsyncEngine, float] = {}
+# user id -> monotonic time until which the user's reads stay on the primary
+_sticky_until: Dict[str, float] = {}
+
 async def get_db() -> AsyncSession:
     """Dependency to get database session."""
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+def mark_write(user_id: str) -> None:
+    """
+    Pin the user's reads to the primary for DATABASE_READ_STICKY_SECONDS, so
+    they see their own writes before the replicas have caught up.
+    """
+    if not read_engines:
+        return
+    now = time.monotonic()
+    if len(_sticky_until) > 10000:
+        for key, until in list(_sticky_until.items()):
+            if until <= now:
+                del _sticky_until[key]
+    _sticky_until[user_id] = now + settings.DATABASE_READ_STICKY_SECONDS
+
+def _healthy_replicas(user_id: Optional[str]) -> List[AsyncEngine]:
+    now = time.monotonic()
+    if user_id is not None and _sticky_until.get(user_id, 0.0) > now:
+        return []
+    healthy = [replica for replica in read_engines if _replica_down_until.get(replica, 0.0) <= now]
+    random.shuffle(healthy)
+    return healthy
+
+@asynccontextmanager
+async def read_session(user_id: Optional[str] = None) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only work: a random healthy replica, or the primary when
+    there are none, all are down, or the user wrote within the sticky window.
+    A replica whose connection fails is skipped for REPLICA_RETRY_SECONDS.
+    """
+    session = None
+    for replica in _healthy_replicas(user_id):
+        candidate = AsyncSessionLocal(bind=replica)
+        try:
+            # Checks out (and pre-pings) a connection now rather than mid-request
+            await candidate.connection()
+        except (DBAPIError, OSError) as error:
+            await candidate.close()
+            _replica_down_until[replica] = time.monotonic() + REPLICA_RETRY_SECONDS
+            logger.warning("Read replica %s unavailable, skipping it: %s", replica.url.render_as_string(), error)
+            continue
+        session = candidate
+        break
+    async with session or AsyncSessionLocal() as session:
+        yield session
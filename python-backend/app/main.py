@@ -1,3 +1,6 @@
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -5,16 +8,62 @@ from fastapi.exceptions import RequestValidationError
 from app.core.config import settings
 from app.utils.helpers import ensure_static_dirs
 from app.core.exceptions import validation_exception_handler, http_exception_handler
+from app.core.events import TodoEventListener
+from app.core.user_cache import user_cache
+from app.core.http_cache import ImmutableStaticFiles
+from app.core.http_client import close_http_client
+from app.services.file_service import FileService, avatar_index
+from app.services.image_service import shutdown_image_pool
+from app.db.session import AsyncSessionLocal, engine
+from app.api.todos.sweeper import OverdueSweeper
+from app.api.todos.reminders import ReminderScheduler, build_reminder_sinks
+from app.api.todos.archiver import TodoArchiver
+from app.api.auth.cleanup import RefreshTokenPurger
+from app.api.users.avatar_gc import AvatarCollector
 from app.api.auth.router import router as auth_router
 from app.api.users.router import router as users_router
 from app.api.todos.router import router as todos_router
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
-# Ensure static upload dir exists (no events.py lifespan)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start/stop background services."""
+    if avatar_index.enabled:
+        # Before serving: profile responses look per-user avatar files up here instead of on disk
+        logger.info("Indexed %d avatar files", await avatar_index.warm(FileService()))
+    services = []
+    if settings.TODO_EVENTS_PG_NOTIFY and engine.dialect.name == "postgresql":
+        # Relay todo events published by other workers to this one's subscribers
+        services.append(TodoEventListener(engine))
+    if settings.TODO_OVERDUE_SWEEPER:
+        services.append(OverdueSweeper(AsyncSessionLocal))
+    if settings.TODO_ARCHIVE_AFTER_DAYS > 0:
+        services.append(TodoArchiver(AsyncSessionLocal))
+    if settings.REFRESH_TOKEN_PURGE:
+        services.append(RefreshTokenPurger(AsyncSessionLocal))
+    if settings.TODO_REMINDERS:
+        services.append(ReminderScheduler(AsyncSessionLocal, build_reminder_sinks(AsyncSessionLocal)))
+    if settings.AVATAR_GC:
+        services.append(AvatarCollector(AsyncSessionLocal))
+    for service in services:
+        service.start()
+    yield
+    for service in reversed(services):
+        await service.stop()
+    await close_http_client()
+    shutdown_image_pool()
+    if user_cache.enabled:
+        logger.info("User cache: %(hits)d hits, %(misses)d misses (hit rate %(hitRate).1%%)", user_cache.stats())
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Ensure static upload dir exists
 ensure_static_dirs()
 
-# Mount static files
+# Mount static files; avatars (content-addressed, never rewritten) first, with far-future caching
+app.mount(f"/static/{Path(settings.UPLOAD_DIR).name}", ImmutableStaticFiles(directory=settings.UPLOAD_DIR), name="avatars")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Configure CORS
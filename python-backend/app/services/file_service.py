@@ -1,11 +1,85 @@
+import asyncio
+import hashlib
 import os
-import shutil
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Optional
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from fastapi import UploadFile, HTTPException, status
 from app.core.config import settings
+from app.services.image_service import AVATAR_VARIANT_SIZES, has_variants, render_variants
+from app.utils.images import variant_filename
 from app.utils.validators import validate_file_extension, validate_file_size
 
+CHUNK_SIZE = 1024 * 1024  # 1MB
+# In-progress uploads; renamed to their final name once complete
+TEMP_PREFIX = ".upload-"
+# Avatars are named by the SHA-256 of their content: <hash>.<ext>
+CONTENT_ADDRESSED_NAME = re.compile(r"^([0-9a-f]{64})\.[a-z0-9]+$")
+# ... and so are their variants: <hash>_<size>.<ext>
+CONTENT_ADDRESSED_FILE = re.compile(r"^([0-9a-f]{64})(?:_\d+)?\.[a-z0-9]+$")
+# Per-user avatars from before content addressing, avatar_<userId>_<suffix>.<ext>,
+# and their variants; group 1 is the stem of the original
+PER_USER_FILE = re.compile(r"^(avatar_([0-9a-f-]{36})_[0-9a-f]+)(?:_\d+)?\.[a-z0-9]+$", re.IGNORECASE)
+WARM_BATCH_SIZE = 1000
+
+# Avatar disk I/O runs on its own threads, so a slow disk neither blocks the
+# event loop nor ties up the default executor other work relies on
+_io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="avatar-io")
+
+
+async def _run_io(func, *args, **kwargs):
+    """Run a blocking file operation on the avatar I/O threads."""
+    return await asyncio.get_running_loop().run_in_executor(_io_pool, partial(func, *args, **kwargs))
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(path: Path) -> None:
+    # Once per process, not per FileService (one is built for every profile request)
+    path.mkdir(parents=True, exist_ok=True)
+
+
+class AvatarIndex:
+    """
+    Known-avatar index: the per-user avatar files (and variants) in UPLOAD_DIR,
+    so building a profile response does no filesystem I/O.
+
+    Content-addressed avatars need no lookup, since a file exists while
+    avatar_files references it. Per-user files are no longer created, so the
+    index is warmed once at startup (streamed with os.scandir) and only
+    shrinks afterwards, as FileService deletes them. Disabled (AVATAR_INDEX)
+    or not yet warmed, lookups fall back to a stat.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.warmed = False
+        self._names: Set[str] = set()
+
+    async def warm(self, files: "FileService") -> int:
+        """Load the per-user files of the upload directory; returns how many there are."""
+        names: Set[str] = set()
+        async for batch in files.scan_uploads(WARM_BATCH_SIZE):
+            names.update(name for name, _, _ in batch if PER_USER_FILE.match(name))
+        self._names = names
+        self.warmed = True
+        return len(names)
+
+    def exists(self, path: Path) -> bool:
+        """Whether the upload at `path` exists."""
+        if not (self.enabled and self.warmed):
+            return path.exists()
+        return path.name in self._names
+
+    def discard(self, filename: str) -> None:
+        self._names.discard(filename)
+
+
+# Global known-avatar index
+avatar_index = AvatarIndex(settings.AVATAR_INDEX)
+
 class FileService:
     """File service for handling file uploads and management."""
     
@@ -15,10 +89,14 @@ class FileService:
         self.allowed_extensions = settings.ALLOWED_EXTENSIONS
         
         # Ensure upload directory exists
-        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(self.upload_dir)
     
-    async def save_avatar(self, file: UploadFile, user_id: str) -> str:
-        """Save user avatar and return the file path."""
+    async def hash_avatar(self, file: UploadFile) -> Tuple[str, str]:
+        """
+        Validate an upload and return its SHA-256 (hex) and lower-case extension.
+        Reads the upload once without writing anything, enforcing the size
+        limit as it goes; hashing runs on the avatar I/O threads.
+        """
         # Validate file
         if not file.filename:
             raise HTTPException(
@@ -34,74 +112,111 @@ class FileService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid file type. Allowed formats: {allowed_list}."
             )
-        
-        # We will enforce size during streaming copy to avoid unreliable seek/tell on temp files
-        
-        # Generate unique filename
-        file_extension = Path(file.filename).suffix
-        filename = f"avatar_{user_id}_{self._generate_unique_suffix()}{file_extension}"
-        file_path = self.upload_dir / filename
-        
-        # Ensure we start from beginning before saving to avoid partial writes
-        try:
-            file.file.seek(0)
-        except Exception:
-            pass
 
-        # Save file with streaming size enforcement
-        bytes_written = 0
-        chunk_size = 1024 * 1024  # 1MB
+        await self._rewind(file)
+        digest = hashlib.sha256()
+        size = 0
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > self.max_file_size:
+                max_mb = max(1, self.max_file_size // (1024 * 1024))
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Image must be {max_mb}MB or below."
+                )
+            # hashlib releases the GIL on large buffers
+            await _run_io(digest.update, chunk)
+        return digest.hexdigest(), Path(file.filename).suffix.lower()
+
+    async def save_avatar(self, file: UploadFile, digest: str, extension: str) -> str:
+        """
+        Store an upload hashed by `hash_avatar` as `<digest><extension>` and
+        return its path relative to the static mount, e.g. 'avatars/<digest>.png'.
+        The upload is streamed to a temporary file and only appears under its
+        final name (an atomic rename) once complete; disk I/O runs on the
+        avatar I/O threads, never on the event loop. Raster images are then
+        resized into their variants (see image_service); an image that cannot
+        be decoded is removed again and rejected.
+        """
+        await self._rewind(file)
+        filename = f"{digest}{extension}"
+        final_path = self.upload_dir / filename
+        temp_path = self.upload_dir / f"{TEMP_PREFIX}{self._generate_unique_suffix()}.tmp"
+        buffer = None
         try:
-            with open(file_path, "wb") as buffer:
-                while True:
-                    chunk = file.file.read(chunk_size)
-                    if not chunk:
-                        break
-                    bytes_written += len(chunk)
-                    if bytes_written > self.max_file_size:
-                        # Abort and remove partial file
-                        try:
-                            buffer.close()
-                        finally:
-                            if file_path.exists():
-                                file_path.unlink(missing_ok=True)
-                        max_mb = max(1, self.max_file_size // (1024 * 1024))
-                        raise HTTPException(
-                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                            detail=f"Image must be {max_mb}MB or below."
-                        )
-                    buffer.write(chunk)
-        except HTTPException:
-            # Re-raise our intentional size error
-            raise
+            buffer = await _run_io(open, temp_path, "wb")
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                await _run_io(self._write_chunk, buffer, chunk)
+            await _run_io(buffer.close)
+            await _run_io(os.replace, temp_path, final_path)
         except Exception as e:
             # Cleanup on failure
-            if file_path.exists():
-                try:
-                    file_path.unlink(missing_ok=True)
-                except Exception:
-                    pass
+            if buffer is not None:
+                await _run_io(buffer.close)
+            await _run_io(temp_path.unlink, missing_ok=True)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to save file: {str(e)}"
             )
+
+        if has_variants(filename):
+            try:
+                await render_variants(final_path)
+            except Exception:
+                await _run_io(final_path.unlink, missing_ok=True)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid image file."
+                )
         
         # Return a relative path from the static mount, e.g., 'avatars/<filename>'
         return f"{self.upload_dir.name}/{filename}"
+
+    @staticmethod
+    async def _rewind(file: UploadFile) -> None:
+        # Start from the beginning, whatever read the upload before
+        try:
+            await file.seek(0)
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _write_chunk(buffer: BinaryIO, chunk: bytes) -> None:
+        """Write one chunk (on an avatar I/O thread)."""
+        buffer.write(chunk)
+
+    @staticmethod
+    def content_hash(filename: str) -> Optional[str]:
+        """The SHA-256 a content-addressed avatar is named by, or None for older (per-user) names."""
+        match = CONTENT_ADDRESSED_NAME.match(filename)
+        return match.group(1) if match else None
     
-    def delete_avatar(self, avatar_path: str) -> bool:
-        """Delete user avatar file."""
+    async def delete_avatar(self, avatar_path: str) -> bool:
+        """Delete user avatar file and its variants."""
         try:
             # Extract filename from path
             filename = avatar_path.split("/")[-1]
             file_path = self.upload_dir / filename
-            
-            if file_path.exists():
-                file_path.unlink()
-                return True
-            return False
+            avatar_index.discard(filename)
+            await _run_io(file_path.unlink)
         except Exception:
             return False
+        if has_variants(filename):
+            await self.remove_files(self.variant_filenames(filename).values())
+        return True
+
+    def variant_filenames(self, filename: str) -> Dict[str, str]:
+        """Variant filenames of a raster avatar: '<size>' -> WebP, 'fallback' -> JPEG."""
+        stem = Path(filename).stem
+        names = {str(size): variant_filename(stem, size, "webp") for size in AVATAR_VARIANT_SIZES}
+        names["fallback"] = variant_filename(stem, settings.AVATAR_DEFAULT_SIZE, "jpg")
+        return names
     
     def get_avatar_url(self, avatar_path: str) -> str:
         """Get full avatar URL."""
@@ -119,19 +234,71 @@ class FileService:
         import secrets
         return secrets.token_hex(8)
     
-    def cleanup_orphaned_files(self) -> int:
-        """Clean up orphaned files (files not referenced in database)."""
-        # This would typically check against database records
-        # For now, just return 0
-        return 0
+    async def scan_uploads(self, batch_size: int) -> AsyncIterator[List[Tuple[str, float, int]]]:
+        """
+        Stream the upload directory as batches of (filename, mtime, size).
+        Entries are read with os.scandir on the avatar I/O threads, one batch
+        at a time, so memory stays bounded however many files there are.
+        """
+        entries = await _run_io(os.scandir, self.upload_dir)
+        try:
+            while True:
+                batch = await _run_io(self._next_files, entries, batch_size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            entries.close()
+
+    @staticmethod
+    def _next_files(entries: Iterator[os.DirEntry], batch_size: int) -> List[Tuple[str, float, int]]:
+        files = []
+        for entry in islice(entries, batch_size):
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    info = entry.stat(follow_symlinks=False)
+                    files.append((entry.name, info.st_mtime, info.st_size))
+            except FileNotFoundError:
+                # Removed since it was listed
+                continue
+        return files
+
+    async def remove_files(self, filenames: Iterable[str], modified_before: Optional[float] = None) -> List[str]:
+        """
+        Delete files of the upload directory (missing ones are ignored); returns
+        the names deleted. With `modified_before` (a timestamp), files modified
+        since then are kept: each is stat'ed right before its unlink.
+        """
+        removed = []
+        for filename in filenames:
+            path = self.upload_dir / filename
+            if modified_before is not None:
+                if not await _run_io(self._unlink_if_older, path, modified_before):
+                    continue
+            else:
+                await _run_io(path.unlink, missing_ok=True)
+            avatar_index.discard(filename)
+            removed.append(filename)
+        return removed
+
+    @staticmethod
+    def _unlink_if_older(path: Path, modified_before: float) -> bool:
+        try:
+            if path.stat().st_mtime >= modified_before:
+                return False
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
     
-    def get_file_info(self, file_path: str) -> dict:
-        """Get file information."""
+    async def get_file_info(self, file_path: str) -> dict:
+        """Get file information (stat runs on the avatar I/O threads)."""
         path = Path(file_path)
-        if not path.exists():
+        try:
+            stat = await _run_io(path.stat)
+        except FileNotFoundError:
             return {}
         
-        stat = path.stat()
         return {
             "filename": path.name,
             "size": stat.st_size,
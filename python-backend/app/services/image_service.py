@@ -0,0 +1,63 @@
+"""
+Avatar variants, rendered in a process pool.
+
+Profiles and lists show avatars at 32-128 px, so every uploaded raster image
+is also stored as square WebP thumbnails (AVATAR_VARIANT_SIZES) and a JPEG
+fallback at AVATAR_DEFAULT_SIZE, next to the original. Decoding and resampling
+are CPU-bound and hold the GIL, so they run in worker processes
+(AVATAR_IMAGE_WORKERS), never on the event loop or its threads. Workers are
+spawned on first use; the lifespan shuts them down.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.images import RASTER_EXTENSIONS, render_avatar_variants
+
+AVATAR_VARIANT_SIZES: Tuple[int, ...] = tuple(
+    sorted({int(size) for size in settings.AVATAR_VARIANT_SIZES.split(",") if size.strip()} | {settings.AVATAR_DEFAULT_SIZE})
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawned, not forked: the parent holds event-loop state, threads and DB connections
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.AVATAR_IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def has_variants(filename: str) -> bool:
+    """Whether variants are rendered for an avatar of this name (SVGs never are)."""
+    return Path(filename).suffix.lower() in RASTER_EXTENSIONS
+
+
+async def render_variants(path: Path) -> List[str]:
+    """Render the variants of the avatar at `path` in a worker process; returns their filenames."""
+    global _pool
+    pool = _get_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            pool, render_avatar_variants, str(path), AVATAR_VARIANT_SIZES, settings.AVATAR_DEFAULT_SIZE
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. killed while decoding); start a fresh pool for the next upload
+        if _pool is pool:
+            _pool = None
+        raise
@@ -2,8 +2,13 @@
 Helpers for filesystem and generic utilities.
 """
 from pathlib import Path
+import base64
+import codecs
+import csv
+import json
 import re
 from datetime import timedelta
+from typing import AsyncIterator, Tuple
 
 from app.core.config import settings
 
@@ -40,4 +45,85 @@ def parse_timedelta(time_str: str) -> timedelta:
         return timedelta(days=value * 365)  # approximate year
 
     # Should be unreachable due to regex
-    raise ValueError(f"Invalid time unit: '{unit}'")
\ No newline at end of file
+    raise ValueError(f"Invalid time unit: '{unit}'")
+
+
+def encode_cursor(values: list) -> str:
+    """Encode a list of JSON-serializable sort key values into an opaque cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+async def iter_text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Decode a stream of UTF-8 byte chunks (optional BOM) and yield complete lines
+    without their line terminators. Raises ValueError on invalid UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        try:
+            pending += decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise ValueError("Body is not valid UTF-8") from e
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.rstrip("\r"):
+        yield pending.rstrip("\r")
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """
+    Yield (record number, parsed value) for each non-blank NDJSON line.
+    A line that is not valid JSON yields a ValueError as its value instead of
+    aborting the stream, so callers can report it and carry on.
+    """
+    number = 0
+    async for line in iter_text_lines(chunks):
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, ValueError("Invalid JSON")
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, dict]]:
+    """
+    Yield (record number, {header: value}) for each data row of a CSV stream.
+    The first row is the header; quoted fields may span lines.
+    """
+    header = None
+    number = 0
+    record = ""
+    async for line in iter_text_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue  # inside a quoted field
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        number += 1
+        yield number, dict(zip(header, values))
@@ -0,0 +1,76 @@
+"""
+Avatar resizing, run inside the image worker processes.
+
+Kept free of app imports so spawned workers only load Pillow.
+"""
+import os
+import secrets
+from pathlib import Path
+from typing import Iterable, List
+
+from PIL import Image, ImageOps
+
+# Extensions Pillow decodes; anything else (SVG) is served as uploaded
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif"}
+# Refuse to decode images beyond this many pixels (a small PNG can inflate to gigabytes)
+MAX_PIXELS = 40_000_000
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+# Variants being written; renamed to their final name once complete
+TEMP_VARIANT_PREFIX = ".variant-"
+
+
+def variant_filename(stem: str, size: int, extension: str) -> str:
+    """Name of a resized avatar, e.g. <hash>_128.webp."""
+    return f"{stem}_{size}.{extension}"
+
+
+def _save_atomically(image: Image.Image, path: Path, **params) -> None:
+    temp_path = path.with_name(f"{TEMP_VARIANT_PREFIX}{secrets.token_hex(8)}.tmp")
+    try:
+        image.save(temp_path, **params)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def render_avatar_variants(source: str, sizes: Iterable[int], fallback_size: int) -> List[str]:
+    """
+    Write square, centre-cropped WebP variants of `source` at each size, plus a
+    JPEG fallback at `fallback_size`, next to it. Returns the new filenames.
+    Raises OSError/ValueError when the file is not a decodable image.
+    """
+    path = Path(source)
+    sizes = sorted(set(sizes) | {fallback_size}, reverse=True)
+    written: List[str] = []
+    try:
+        with Image.open(path) as image:
+            if image.width * image.height > MAX_PIXELS:
+                raise ValueError("Image dimensions are too large")
+            # JPEG only: decode at a reduced scale that still covers the largest variant
+            image.draft("RGB", (sizes[0], sizes[0]))
+            image = ImageOps.exif_transpose(image)
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        largest = ImageOps.fit(image, (sizes[0], sizes[0]), Image.Resampling.LANCZOS)
+        for size in sizes:
+            variant = largest if size == sizes[0] else largest.resize((size, size), Image.Resampling.LANCZOS)
+            name = variant_filename(path.stem, size, "webp")
+            _save_atomically(variant, path.with_name(name), format="WEBP", quality=WEBP_QUALITY, method=4)
+            written.append(name)
+            if size == fallback_size:
+                if has_alpha:
+                    # JPEG has no alpha channel: flatten onto white
+                    background = Image.new("RGB", variant.size, (255, 255, 255))
+                    background.paste(variant, mask=variant.getchannel("A"))
+                    variant = background
+                name = variant_filename(path.stem, size, "jpg")
+                _save_atomically(variant, path.with_name(name), format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                written.append(name)
+    except BaseException:
+        for name in written:
+            path.with_name(name).unlink(missing_ok=True)
+        raise
+    return written
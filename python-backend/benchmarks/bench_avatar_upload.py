@@ -0,0 +1,114 @@
+"""
+Load test: event-loop latency while avatar uploads are in flight.
+
+A probe task sleeps 1 ms in a loop and records how late it wakes up, first
+with the loop idle, then while CONCURRENCY uploads of UPLOAD_BYTES each run
+through the previous blocking copy (open()/file.read() on the loop) and
+through FileService.hash_avatar + save_avatar. Disk writes are slowed by SLOW_WRITE_MS per
+chunk to stand in for a slow or contended disk (0 measures the local disk).
+
+Usage (from python-backend/):
+    python -m benchmarks.bench_avatar_upload
+"""
+import asyncio
+import io
+import os
+import statistics
+import tempfile
+import time
+from typing import Awaitable, Callable, List
+
+# Settings are required at import time; the values are irrelevant here
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite://")
+for key in ("ACCESS_TOKEN_SECRET", "REFRESH_TOKEN_SECRET", "API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.services import file_service
+from app.services.file_service import CHUNK_SIZE, FileService
+
+CONCURRENCY = 8
+ROUNDS = 5
+UPLOAD_BYTES = 2 * 1024 * 1024 - 1
+SLOW_WRITE_MS = float(os.environ.get("SLOW_WRITE_MS", "20"))
+PROBE_INTERVAL = 0.001
+
+
+def slow_write(buffer, chunk: bytes) -> None:
+    time.sleep(SLOW_WRITE_MS / 1000)
+    buffer.write(chunk)
+
+
+def make_upload(payload: bytes) -> UploadFile:
+    # An SVG gets no resized variants, so only the streaming copy is measured
+    return UploadFile(io.BytesIO(payload), filename="avatar.svg", headers=Headers({"content-type": "image/svg+xml"}))
+
+
+async def blocking_save(directory: str, upload: UploadFile) -> None:
+    """The previous FileService.save_avatar copy loop, blocking the loop on every read and write."""
+    with open(os.path.join(directory, f"blocking_{id(upload)}.svg"), "wb") as buffer:
+        while True:
+            chunk = upload.file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            slow_write(buffer, chunk)
+
+
+async def probe(stop: asyncio.Event, lags: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def measure(uploads: Callable[[], Awaitable[None]]) -> List[float]:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, lags))
+    await asyncio.sleep(0.01)
+    for _ in range(ROUNDS):
+        await uploads()
+    stop.set()
+    await probe_task
+    return lags
+
+
+def report(label: str, lags: List[float]) -> None:
+    lags = sorted(lags)
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(f"{label:<28} {statistics.median(lags) * 1000:>8.2f} {p99 * 1000:>8.2f} {lags[-1] * 1000:>8.2f}")
+
+
+async def main() -> None:
+    payload = os.urandom(UPLOAD_BYTES)
+    with tempfile.TemporaryDirectory() as directory:
+        file_service.settings.UPLOAD_DIR = directory
+        service = FileService()
+        # Same simulated disk for both paths
+        FileService._write_chunk = staticmethod(slow_write)
+
+        async def idle() -> None:
+            await asyncio.sleep(0.2)
+
+        async def blocking() -> None:
+            await asyncio.gather(*(blocking_save(directory, make_upload(payload)) for _ in range(CONCURRENCY)))
+
+        async def store(upload: UploadFile) -> None:
+            digest, extension = await service.hash_avatar(upload)
+            await service.save_avatar(upload, digest, extension)
+
+        async def pipeline() -> None:
+            await asyncio.gather(*(store(make_upload(payload)) for _ in range(CONCURRENCY)))
+
+        print(f"{CONCURRENCY} concurrent uploads of {UPLOAD_BYTES / 2**20:.1f} MB, {SLOW_WRITE_MS:g} ms per chunk write")
+        print(f"{'event-loop lag (ms)':<28} {'median':>8} {'p99':>8} {'max':>8}")
+        report("idle", await measure(idle))
+        report("blocking copy", await measure(blocking))
+        report("FileService.save_avatar", await measure(pipeline))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
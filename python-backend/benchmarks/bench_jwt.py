@@ -0,0 +1,134 @@
+"""
+Micro-benchmark: issuing and verifying access tokens.
+
+Runs the create_access_token/verify_token pair on python-jose (what
+app.core.security uses), joserfc (installed with Authlib) and PyJWT (when
+installed), all behind the same interface and checked to accept each other's
+tokens, plus app.core.security.verify_token with the decoded-token cache on.
+
+Usage (from python-backend/):
+    python -m benchmarks.bench_jwt
+"""
+import os
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+# Settings are required at import time; the values are irrelevant here
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+os.environ.setdefault("DATABASE_SYNC_URL", "sqlite://")
+for key in ("ACCESS_TOKEN_SECRET", "REFRESH_TOKEN_SECRET"):
+    os.environ.setdefault(key, "benchmark-secret-benchmark-secret-0123")
+os.environ.setdefault("API_KEY", "benchmark")
+
+from jose import JWTError, jwt as jose_jwt
+from joserfc import jwt as joserfc_jwt
+from joserfc.errors import JoseError
+from joserfc.jwk import OctKey
+
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT is optional
+    pyjwt = None
+
+from app.core import security
+from app.core.config import settings
+
+NUMBER = 2_000
+REPEAT = 5
+
+# (create_access_token(data), verify_token(token, token_type))
+Backend = Tuple[Callable[[dict], str], Callable[[str, str], Optional[dict]]]
+
+
+def _claims(data: dict) -> dict:
+    expire = datetime.utcnow() + timedelta(minutes=30)
+    return {**data, "exp": int(expire.timestamp()), "type": "access", "jti": str(uuid.uuid4())}
+
+
+def _checked(payload: dict, token_type: str) -> Optional[dict]:
+    return payload if payload.get("type") == token_type else None
+
+
+def jose_backend() -> Backend:
+    def create(data: dict) -> str:
+        return jose_jwt.encode(_claims(data), settings.ACCESS_TOKEN_SECRET, algorithm=settings.ALGORITHM)
+
+    def verify(token: str, token_type: str = "access") -> Optional[dict]:
+        try:
+            return _checked(jose_jwt.decode(token, settings.ACCESS_TOKEN_SECRET, algorithms=[settings.ALGORITHM]), token_type)
+        except JWTError:
+            return None
+
+    return create, verify
+
+
+def joserfc_backend() -> Backend:
+    key = OctKey.import_key(settings.ACCESS_TOKEN_SECRET)
+    registry = joserfc_jwt.JWTClaimsRegistry(exp={"essential": True})
+
+    def create(data: dict) -> str:
+        return joserfc_jwt.encode({"alg": settings.ALGORITHM}, _claims(data), key)
+
+    def verify(token: str, token_type: str = "access") -> Optional[dict]:
+        try:
+            claims = joserfc_jwt.decode(token, key, algorithms=[settings.ALGORITHM]).claims
+            registry.validate(claims)
+        except (JoseError, ValueError):
+            return None
+        return _checked(claims, token_type)
+
+    return create, verify
+
+
+def pyjwt_backend() -> Backend:
+    def create(data: dict) -> str:
+        return pyjwt.encode(_claims(data), settings.ACCESS_TOKEN_SECRET, algorithm=settings.ALGORITHM)
+
+    def verify(token: str, token_type: str = "access") -> Optional[dict]:
+        try:
+            return _checked(pyjwt.decode(token, settings.ACCESS_TOKEN_SECRET, algorithms=[settings.ALGORITHM]), token_type)
+        except pyjwt.PyJWTError:
+            return None
+
+    return create, verify
+
+
+def main() -> None:
+    backends: List[Tuple[str, Backend]] = [("python-jose", jose_backend()), ("joserfc", joserfc_backend())]
+    if pyjwt is not None:
+        backends.append(("PyJWT", pyjwt_backend()))
+    else:
+        print("PyJWT not installed; skipping it\n")
+
+    # Every backend must accept every other backend's tokens
+    for _, (create, _) in backends:
+        token = create({"sub": "user"})
+        for name, (_, verify) in backends:
+            assert verify(token, "access")["sub"] == "user", name
+            assert verify(token, "refresh") is None, name
+
+    token = backends[0][1][0]({"sub": "user"})
+    print(f"{'backend':<28} {'create':>10} {'verify':>10}   (µs per call)")
+    baseline = None
+    for name, (create, verify) in backends:
+        create_time = min(timeit.repeat(lambda: create({"sub": "user"}), number=NUMBER, repeat=REPEAT)) / NUMBER
+        verify_time = min(timeit.repeat(lambda: verify(token, "access"), number=NUMBER, repeat=REPEAT)) / NUMBER
+        baseline = baseline or verify_time
+        print(f"{name:<28} {create_time * 1e6:>10.1f} {verify_time * 1e6:>10.1f}   {baseline / verify_time:>5.1f}x verify")
+
+    # The app's verify_token, cache off vs on (same python-jose decode underneath)
+    app_token = security.create_access_token({"sub": "user"})
+    for enabled in (False, True):
+        security.token_cache.enabled = enabled
+        security.token_cache.clear()
+        verify_time = min(timeit.repeat(
+            lambda: security.verify_token(app_token, "access"), number=NUMBER, repeat=REPEAT
+        )) / NUMBER
+        label = f"verify_token (cache {'on' if enabled else 'off'})"
+        print(f"{label:<28} {'':>10} {verify_time * 1e6:>10.1f}   {baseline / verify_time:>5.1f}x verify")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Load test: GET /user/me under concurrency, with and without the known-avatar index.
+
+CONCURRENCY clients request the profile of a user whose avatar is a per-user
+upload from before content addressing (the case that used to stat the file
+on every request), REQUESTS times in total, through the ASGI app on a
+throwaway SQLite database. Stats are slowed by SLOW_STAT_MS to stand in for
+a network or contended volume (0 measures the local disk); the stat calls
+made per request are counted.
+
+Usage (from python-backend/):
+    python -m benchmarks.bench_profile
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import List
+
+# A scratch database and static directory, whatever the environment points at
+WORKDIR = tempfile.mkdtemp(prefix="bench-profile-")
+os.chdir(WORKDIR)
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{WORKDIR}/bench.db"
+os.environ["DATABASE_SYNC_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ["UPLOAD_DIR"] = "static/avatars"
+for key in ("ACCESS_TOKEN_SECRET", "REFRESH_TOKEN_SECRET"):
+    os.environ.setdefault(key, "benchmark-secret-benchmark-secret-0123")
+os.environ.setdefault("API_KEY", "benchmark")
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.services.file_service import FileService, avatar_index
+# Every table, for create_all
+from app.db.models import avatar_file, notification, refresh_token, todo_archive, todo_counter, todo_tombstone  # noqa: F401
+
+CONCURRENCY = 32
+REQUESTS = 4_000
+SLOW_STAT_MS = float(os.environ.get("SLOW_STAT_MS", "1"))
+
+stat_calls = 0
+_exists = Path.exists
+
+
+def slow_exists(self: Path, *args, **kwargs) -> bool:
+    global stat_calls
+    stat_calls += 1
+    time.sleep(SLOW_STAT_MS / 1000)
+    return _exists(self, *args, **kwargs)
+
+
+async def setup() -> dict:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    user_id = str(uuid.uuid4())
+    filename = f"avatar_{user_id}_{uuid.uuid4().hex[:16]}.png"
+    (Path(settings.UPLOAD_DIR) / filename).write_bytes(b"\x89PNG")
+    async with AsyncSessionLocal() as session:
+        session.add(User(id=user_id, email=f"{user_id}@example.com", name="Bench", avatar=f"avatars/{filename}"))
+        await session.commit()
+    return {"Authorization": f"Bearer {create_access_token({'sub': user_id})}", "X-API-Key": settings.API_KEY}
+
+
+async def run(client: httpx.AsyncClient, headers: dict) -> List[float]:
+    latencies: List[float] = []
+    remaining = iter(range(REQUESTS))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get("/user/me", headers=headers)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200 and response.json()["avatar"], response.text
+
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return latencies
+
+
+async def main() -> None:
+    global stat_calls
+    headers = await setup()
+    await avatar_index.warm(FileService())
+    Path.exists = slow_exists
+    print(f"{CONCURRENCY} concurrent clients, {REQUESTS} x GET /user/me, {SLOW_STAT_MS:g} ms per stat")
+    print(f"{'avatar lookup':<24} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'stats/req':>10}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        await run(client, headers)  # warm-up: user cache, connection pool
+        for label, enabled in (("stat per request", False), ("known-avatar index", True)):
+            avatar_index.enabled = enabled
+            stat_calls = 0
+            started = time.perf_counter()
+            latencies = sorted(await run(client, headers))
+            elapsed = time.perf_counter() - started
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(
+                f"{label:<24} {REQUESTS / elapsed:>8.0f} {statistics.median(latencies) * 1000:>8.2f} "
+                f"{p99 * 1000:>8.2f} {stat_calls / REQUESTS:>10.2f}"
+            )
+    Path.exists = _exists
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+# Settings are read at import time; the tests need no real database or secrets
+for key, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "DATABASE_SYNC_URL": "sqlite://",
+    "ACCESS_TOKEN_SECRET": "test-access-secret",
+    "REFRESH_TOKEN_SECRET": "test-refresh-secret",
+    "API_KEY": "test-api-key",
+}.items():
+    os.environ.setdefault(key, value)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def session(tmp_path):
+    """A session on a fresh SQLite database with every table (and the search triggers)."""
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    from app.db.base import Base
+    from app.db import search  # noqa: F401  (FTS5 table and triggers)
+    from app.db.models import avatar_file, notification, refresh_token, todo, todo_archive, todo_counter, todo_tombstone, user  # noqa: F401
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
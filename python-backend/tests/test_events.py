@@ -0,0 +1,87 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.core import events
+from app.core.events import RESYNC, TodoEventHub
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_publish_fans_out_to_each_subscriber_of_the_user():
+    hub = TodoEventHub()
+    event = {"type": "updated", "id": "t1"}
+    async with hub.subscribe("alice") as first, hub.subscribe("alice") as second, hub.subscribe("bob") as other:
+        hub.publish("alice", [event])
+        assert first.get_nowait() == event
+        assert second.get_nowait() == event
+        assert other.empty()
+
+
+async def test_unsubscribe_drops_the_user_once_their_last_queue_closes():
+    hub = TodoEventHub()
+    async with hub.subscribe("alice"):
+        async with hub.subscribe("alice"):
+            pass
+        assert "alice" in hub._subscribers
+    assert hub._subscribers == {}
+    hub.publish("alice", [{"type": "deleted", "id": "t1"}])
+
+
+async def test_publish_all_reaches_every_user_and_listeners_see_every_publish():
+    hub = TodoEventHub()
+    seen = []
+    hub.add_listener(lambda user_id, published: seen.append((user_id, published)))
+    async with hub.subscribe("alice") as alice, hub.subscribe("bob") as bob:
+        hub.publish("alice", [{"type": "created", "id": "t1"}])
+        hub.publish_all(RESYNC)
+        assert bob.get_nowait() == RESYNC
+        assert alice.get_nowait()["type"] == "created"
+        assert alice.get_nowait() == RESYNC
+    assert seen == [("alice", [{"type": "created", "id": "t1"}]), (None, [RESYNC])]
+
+
+async def test_large_writes_are_announced_as_a_single_resync():
+    hub = TodoEventHub()
+    async with hub.subscribe("alice") as queue:
+        hub.publish("alice", [{"type": "deleted", "id": str(i)} for i in range(events.MAX_EVENTS_PER_WRITE + 1)])
+        assert queue.get_nowait() == RESYNC
+        assert queue.empty()
+
+
+async def test_slow_subscriber_is_told_to_resync_without_affecting_others(monkeypatch):
+    monkeypatch.setattr(events, "SUBSCRIBER_QUEUE_SIZE", 3)
+    hub = TodoEventHub()
+    async with hub.subscribe("alice") as slow, hub.subscribe("alice") as fast:
+        for i in range(3):
+            hub.publish("alice", [{"type": "updated", "id": str(i)}])
+            fast.get_nowait()
+        hub.publish("alice", [{"type": "updated", "id": "3"}])
+        assert fast.get_nowait()["id"] == "3"
+        # The backlog is dropped for one resync, then delivery carries on
+        assert slow.get_nowait() == RESYNC
+        assert slow.empty()
+        hub.publish("alice", [{"type": "updated", "id": "4"}])
+        assert slow.get_nowait()["id"] == "4"
+
+
+async def test_sse_frames_events_and_sends_keepalives(monkeypatch):
+    monkeypatch.setattr(events, "KEEPALIVE_SECONDS", 0.01)
+    hub = TodoEventHub()
+    stream = hub.sse("alice")
+    assert await stream.__anext__() == f"retry: {events.RECONNECT_SECONDS * 1000}\n\n"
+
+    event = {"type": "created", "id": "t1", "todo": {"title": "Write tests"}}
+    pending = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    hub.publish("alice", [event])
+    frame = await pending
+    header, data, end = frame.split("\n", 2)
+    assert header == "event: created"
+    assert orjson.loads(data.removeprefix("data: ")) == event
+    assert end == "\n"
+
+    assert await stream.__anext__() == ": keepalive\n\n"
+    await stream.aclose()
+    assert hub._subscribers == {}
@@ -0,0 +1,210 @@
+import hashlib
+import hmac
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+from jose.utils import base64url_encode
+
+from app.core import oauth
+from app.core.exceptions import UnauthorizedException
+from app.core.oauth import CachedDocument, GoogleOAuth
+
+pytestmark = pytest.mark.anyio
+
+ISSUER = "https://accounts.example.test"
+DISCOVERY_URL = f"{ISSUER}/.well-known/openid-configuration"
+CLIENT_ID = "client-123.apps.example.test"
+
+
+def _rsa_key(kid: str) -> dict:
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return {"kid": kid, "pem": pem, "jwk": {**public, "kid": kid, "use": "sig"}}
+
+
+class StubProvider:
+    """An OIDC provider served by httpx.MockTransport, signing with local RSA keys."""
+
+    def __init__(self):
+        self.keys = [_rsa_key("key-1")]
+        self.requests = []
+        self.jwks_status = 200
+        self.discovery = {
+            "issuer": ISSUER,
+            "token_endpoint": f"{ISSUER}/token",
+            "userinfo_endpoint": f"{ISSUER}/userinfo",
+            "jwks_uri": f"{ISSUER}/jwks",
+        }
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.path)
+        if str(request.url) == DISCOVERY_URL:
+            return httpx.Response(200, json=self.discovery, headers={"Cache-Control": "public, max-age=3600"})
+        if request.url.path == "/jwks":
+            keys = [key["jwk"] for key in self.keys]
+            return httpx.Response(self.jwks_status, json={"keys": keys}, headers={"Cache-Control": "public, max-age=300"})
+        if request.url.path == "/userinfo":
+            return httpx.Response(200, json={"email": "userinfo@example.test"})
+        return httpx.Response(404)
+
+    def fetches(self, path: str) -> int:
+        return self.requests.count(path)
+
+    def sign(self, key: dict = None, access_token: str = None, algorithm: str = "RS256", **claims) -> str:
+        key = key or self.keys[0]
+        now = int(time.time())
+        payload = {
+            "iss": ISSUER, "aud": CLIENT_ID, "sub": "1234", "email": "ada@example.test",
+            "iat": now, "exp": now + 3600, **claims,
+        }
+        return jwt.encode(payload, key["pem"], algorithm=algorithm, headers={"kid": key["kid"]}, access_token=access_token)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def provider(monkeypatch) -> StubProvider:
+    stub = StubProvider()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(stub.handler))
+    monkeypatch.setattr(oauth, "get_http_client", lambda: client)
+    return stub
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(oauth, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def google(monkeypatch, provider, clock) -> GoogleOAuth:
+    monkeypatch.setattr(oauth.settings, "GOOGLE_CLIENT_ID", CLIENT_ID)
+    monkeypatch.setattr(oauth.settings, "GOOGLE_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(oauth.settings, "GOOGLE_REDIRECT_URI", "http://localhost/auth/google/callback")
+    monkeypatch.setattr(oauth.settings, "GOOGLE_DISCOVERY_URL", DISCOVERY_URL)
+    return GoogleOAuth()
+
+
+async def test_discovery_and_jwks_are_fetched_once_while_fresh(google, provider, clock):
+    for _ in range(3):
+        claims = await google.verify_id_token(provider.sign())
+        assert claims["email"] == "ada@example.test"
+        clock.now += 60
+    assert provider.fetches("/.well-known/openid-configuration") == 1
+    assert provider.fetches("/jwks") == 1
+
+
+async def test_login_claims_come_from_the_id_token_without_userinfo(google, provider):
+    token_data = {"access_token": "access-1", "id_token": provider.sign(access_token="access-1")}
+    claims = await google.get_login_claims(token_data)
+    assert claims["email"] == "ada@example.test"
+    assert provider.fetches("/userinfo") == 0
+
+
+async def test_stale_document_is_served_while_one_background_fetch_replaces_it(provider, clock):
+    document = CachedDocument(DISCOVERY_URL)
+    assert (await document.get())["issuer"] == ISSUER
+    provider.discovery = {**provider.discovery, "issuer": "https://rotated.example.test"}
+
+    clock.now += 3600
+    assert (await document.get())["issuer"] == ISSUER
+    assert (await document.get())["issuer"] == ISSUER
+    await document._background
+    assert provider.fetches("/.well-known/openid-configuration") == 2
+    assert (await document.get())["issuer"] == "https://rotated.example.test"
+
+
+async def test_failed_revalidation_keeps_the_stale_copy_until_too_stale(provider, clock):
+    document = CachedDocument(f"{ISSUER}/jwks")
+    await document.get()
+    provider.jwks_status = 503
+
+    clock.now += 300
+    assert (await document.get())["keys"]
+    await document._background
+    assert (await document.get())["keys"]
+
+    clock.now += oauth.MAX_STALE_SECONDS
+    with pytest.raises(httpx.HTTPStatusError):
+        await document.get()
+
+
+async def test_unknown_kid_refetches_the_jwks_at_most_once_a_minute(google, provider, clock):
+    await google.verify_id_token(provider.sign())
+    rotated = _rsa_key("key-2")
+    provider.keys.append(rotated)
+
+    claims = await google.verify_id_token(provider.sign(key=rotated))
+    assert claims["sub"] == "1234"
+    assert provider.fetches("/jwks") == 2
+
+    with pytest.raises(UnauthorizedException):
+        await google.verify_id_token(provider.sign(key=_rsa_key("key-3")))
+    assert provider.fetches("/jwks") == 2
+
+    clock.now += oauth.MIN_FORCED_REFRESH_SECONDS
+    with pytest.raises(UnauthorizedException):
+        await google.verify_id_token(provider.sign(key=_rsa_key("key-4")))
+    assert provider.fetches("/jwks") == 3
+
+
+async def test_issuer_is_accepted_with_or_without_scheme(google, provider):
+    await google.verify_id_token(provider.sign(iss="accounts.example.test"))
+    with pytest.raises(UnauthorizedException):
+        await google.verify_id_token(provider.sign(iss="https://evil.example.test"))
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"aud": "someone-else.apps.example.test"},
+        {"exp": int(time.time()) - oauth.ID_TOKEN_LEEWAY_SECONDS - 60},
+    ],
+    ids=["audience", "expired"],
+)
+async def test_rejects_tokens_for_another_client_or_expired(google, provider, claims):
+    with pytest.raises(UnauthorizedException):
+        await google.verify_id_token(provider.sign(**claims))
+
+
+async def test_expiry_allows_the_leeway(google, provider):
+    await google.verify_id_token(provider.sign(exp=int(time.time()) - oauth.ID_TOKEN_LEEWAY_SECONDS // 2))
+
+
+async def test_at_hash_must_match_the_access_token(google, provider):
+    token = provider.sign(access_token="access-1")
+    await google.verify_id_token(token, "access-1")
+    with pytest.raises(UnauthorizedException):
+        await google.verify_id_token(token, "access-2")
+
+
+async def test_only_rs256_is_accepted(google, provider):
+    with pytest.raises(UnauthorizedException):
+        await google.verify_id_token(provider.sign(algorithm="RS512"))
+    # The classic confusion attack: HMAC keyed with the provider's public key (built by hand,
+    # since jose refuses to sign with one)
+    public_pem = jwk.construct(provider.keys[0]["jwk"], "RS256").to_pem()
+    header = base64url_encode(json.dumps({"alg": "HS256", "typ": "JWT", "kid": "key-1"}).encode())
+    payload = base64url_encode(json.dumps(
+        {"iss": ISSUER, "aud": CLIENT_ID, "sub": "1234", "exp": int(time.time()) + 3600}
+    ).encode())
+    signature = base64url_encode(hmac.new(public_pem, header + b"." + payload, hashlib.sha256).digest())
+    forged = b".".join([header, payload, signature]).decode()
+    with pytest.raises(UnauthorizedException):
+        await google.verify_id_token(forged)
@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.todos.archiver import archive_completed
+from app.api.todos.service import TodoService
+from app.db.models.todo import Todo
+from app.db.models.todo_archive import TodoArchive
+from app.db.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+DUE = (datetime.now(timezone.utc) + timedelta(days=7)).date().isoformat()
+
+
+@pytest.fixture
+async def user_id(session) -> str:
+    user = User(id=str(uuid.uuid4()), email="ada@example.test", name="Ada")
+    session.add(user)
+    await session.commit()
+    return user.id
+
+
+async def archived_todo(session, user_id: str, title: str = "File taxes") -> dict:
+    service = TodoService(session)
+    todo = await service.create(user_id, {
+        "title": title, "description": "", "priority": "high", "category": "work", "dueDate": DUE,
+    })
+    await service.update(user_id, todo["id"], {"completed": True})
+    assert await archive_completed(session, datetime.now(timezone.utc) + timedelta(days=1)) == 1
+    return todo
+
+
+async def test_patching_an_archived_todo_moves_it_back(session, user_id):
+    todo = await archived_todo(session, user_id)
+    service = TodoService(session)
+    before = await service.counters.get(user_id)
+
+    updated = await service.update(user_id, todo["id"], {"completed": False, "priority": "low"})
+
+    assert updated["completed"] is False and updated["priority"] == "low"
+    assert await session.scalar(select(Todo.status).where(Todo.id == todo["id"])) == "pending"
+    assert await session.scalar(select(TodoArchive.id).where(TodoArchive.id == todo["id"])) is None
+    counters = await service.counters.get(user_id)
+    assert counters[("completed", "")] == before[("completed", "")] - 1
+    assert counters[("priority", "low")] == 1 and counters[("priority", "high")] == 0
+    assert counters[("total", "")] == before[("total", "")]
+
+
+async def test_batch_update_reaches_archived_todos(session, user_id):
+    todo = await archived_todo(session, user_id)
+    results = await TodoService(session).update_many(user_id, [
+        {"id": todo["id"], "title": "File taxes (amended)"},
+        {"id": "missing", "title": "Nope"},
+    ])
+    assert [result["status"] for result in results] == [200, 404]
+    assert await session.scalar(select(Todo.title).where(Todo.id == todo["id"])) == "File taxes (amended)"
+
+
+async def test_rejected_update_leaves_the_todo_archived(session, user_id):
+    todo = await archived_todo(session, user_id)
+    with pytest.raises(HTTPException) as error:
+        await TodoService(session).update(user_id, todo["id"], {"dueDate": "2000-01-01"})
+    assert error.value.status_code == 400
+    assert await session.scalar(select(TodoArchive.id).where(TodoArchive.id == todo["id"])) == todo["id"]
+
+
+async def test_archived_todo_whose_title_was_reused_cannot_be_restored(session, user_id):
+    todo = await archived_todo(session, user_id)
+    service = TodoService(session)
+    await service.create(user_id, {
+        "title": "File taxes", "description": "", "priority": "low", "category": "work", "dueDate": DUE,
+    })
+    with pytest.raises(HTTPException) as error:
+        await service.update(user_id, todo["id"], {"completed": False})
+    assert error.value.status_code == 409
+    results = await service.update_many(user_id, [{"id": todo["id"], "completed": False}])
+    assert results[0]["status"] == 409
+
+
+async def test_full_sync_includes_archived_todos(session, user_id):
+    todo = await archived_todo(session, user_id)
+    service = TodoService(session)
+
+    full = await service.changes(user_id)
+    assert full["reset"] is True
+    assert [change["id"] for change in full["changes"]] == [todo["id"]]
+
+    delta = await service.changes(user_id, full["sync_token"])
+    assert delta["reset"] is False
+    assert delta["deleted"] == []
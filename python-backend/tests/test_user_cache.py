@@ -0,0 +1,53 @@
+import uuid
+
+import pytest
+from fastapi import Response
+from starlette.requests import Request
+
+from app.api.auth.service import AuthService
+from app.api.users.service import UserService
+from app.core.user_cache import user_cache
+from app.db.models.user import User
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture
+async def user(session) -> User:
+    user = User(id=str(uuid.uuid4()), email="ada@example.test", name="Ada")
+    session.add(user)
+    await session.commit()
+    user_cache.put(user)
+    assert user_cache.get(user.id) is not None
+    return user
+
+
+def make_request() -> Request:
+    return Request({"type": "http", "method": "PATCH", "path": "/user/me", "headers": [], "scheme": "http", "server": ("testserver", 80)})
+
+
+async def test_update_me_drops_the_cached_user(session, user):
+    profile = await UserService(session).update_me(user.id, {"name": "Ada Lovelace"}, None, make_request())
+    assert profile["name"] == "Ada Lovelace"
+    assert user_cache.get(user.id) is None
+
+
+@pytest.mark.parametrize("everywhere", [False, True], ids=["session", "everywhere"])
+async def test_logout_drops_the_cached_user(session, user, everywhere):
+    await AuthService(session).logout(user.id, Response(), refresh_token="token", everywhere=everywhere)
+    assert user_cache.get(user.id) is None
+
+
+async def test_cached_users_are_detached_copies_that_expire(user, monkeypatch):
+    first, second = user_cache.get(user.id), user_cache.get(user.id)
+    assert first is not second and first.name == "Ada"
+    monkeypatch.setattr(user_cache, "ttl", 0.0)
+    user_cache.put(user)
+    assert user_cache.get(user.id) is None